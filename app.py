@@ -1,22 +1,47 @@
+import time
+
+START_TIME = time.perf_counter()
+
+import argparse
+import math
 import tkinter as tk
 from tkinter import ttk, messagebox
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import matplotlib.patches as mpatches
-from data_fetcher import analyze_ticker
-from database import get_earnings_history, get_watchlist, add_to_watchlist, remove_from_watchlist
-import threading
-
-# --- Color Scheme ---
-BG_DARK = "#1e1e2e"
-BG_MID = "#2a2a3e"
-BG_LIGHT = "#313145"
-ACCENT = "#4f8ef7"
-GREEN = "#4caf82"
-RED = "#e05c5c"
-TEXT = "#e0e0e0"
-TEXT_DIM = "#888888"
-WHITE = "#ffffff"
+import metrics
+from jobs import JobExecutor
+from database import (init_db, get_earnings_history, get_watchlist, add_to_watchlist,
+                      remove_from_watchlist, count_watchlist, search_watchlist,
+                      get_app_state, set_app_state)
+from virtual_list import QueryRows, VirtualList, VirtualTable
+from theme import BG_DARK, BG_MID, BG_LIGHT, ACCENT, GREEN, RED, TEXT, TEXT_DIM, WHITE
+
+# matplotlib, pandas and yfinance are slow to import, so they are loaded in the
+# background after the window is up (see _warm_imports) or inside the methods using them
+
+# Milliseconds between redraws while results stream in
+STREAM_FLUSH_MS = 50
+
+
+def _warm_imports():
+    """Import the heavy modules off the Tk thread so they are ready when needed."""
+    import matplotlib
+    matplotlib.use("TkAgg")
+    import matplotlib.backends.backend_tkagg
+    import matplotlib.figure
+    import chart
+    import data_fetcher
+    import scanner
+    import stats
+    import yfinance
+
+
+def _eps_float(value):
+    """Float EPS value, or None when missing or NaN."""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(value) else value
+
 
 class EarningsAnalyzer(tk.Tk):
     def __init__(self):
@@ -27,10 +52,18 @@ class EarningsAnalyzer(tk.Tk):
         self.resizable(True, True)
         self.protocol("WM_DELETE_WINDOW", self._on_close)
         self.current_summary = None
+        self.streamed_results = []
+        self.pending_rows = []
+        self.flush_scheduled = None
+        self.chart = None
+        self.startup_times = {}
+        self.jobs = JobExecutor(dispatch=lambda fn: self.after(0, fn),
+                                on_change=self._update_job_status)
         self._build_ui()
+        self.after_idle(self._on_first_paint)
 
     def _on_close(self):
-        plt.close("all")
+        self.jobs.shutdown()
         self.quit()
         self.destroy()
 
@@ -43,6 +76,11 @@ class EarningsAnalyzer(tk.Tk):
         tk.Label(header, text="Time Spread Candidate Tool",
                  font=("Calibri", 11), bg=ACCENT, fg=WHITE).pack(side="left", padx=5, pady=10)
 
+        # --- Status Bar ---
+        self.job_status_var = tk.StringVar(value="Idle")
+        tk.Label(self, textvariable=self.job_status_var, font=("Calibri", 9),
+                 bg=BG_MID, fg=TEXT_DIM, anchor="w").pack(side="bottom", fill="x", ipadx=15, ipady=2)
+
         # --- Main Layout ---
         main = tk.Frame(self, bg=BG_DARK)
         main.pack(fill="both", expand=True, padx=15, pady=15)
@@ -85,7 +123,8 @@ class EarningsAnalyzer(tk.Tk):
         lookback_frame.pack(fill="x", padx=15, pady=(2, 10))
         for val in [4, 8, 12]:
             tk.Radiobutton(lookback_frame, text=str(val), variable=self.lookback_var,
-                           value=val, bg=BG_MID, fg=TEXT, selectcolor=BG_LIGHT,
+                           value=val, command=self._on_lookback_change,
+                           bg=BG_MID, fg=TEXT, selectcolor=BG_LIGHT,
                            activebackground=BG_MID, font=("Calibri", 9)).pack(side="left")
 
         # Status
@@ -108,17 +147,33 @@ class EarningsAnalyzer(tk.Tk):
         tk.Button(wl_btn_frame, text="− Remove", font=("Calibri", 9),
                   bg=RED, fg=WHITE, relief="flat", cursor="hand2",
                   command=self._remove_from_watchlist).pack(side="left", ipady=3, ipadx=5)
-
-        # Watchlist listbox
+        tk.Button(wl_btn_frame, text="Scan All", font=("Calibri", 9),
+                  bg=ACCENT, fg=WHITE, relief="flat", cursor="hand2",
+                  command=self._scan_watchlist).pack(side="right", ipady=3, ipadx=5)
+        tk.Button(wl_btn_frame, text="Compare", font=("Calibri", 9),
+                  bg=BG_LIGHT, fg=WHITE, relief="flat", cursor="hand2",
+                  command=self._compare_watchlist).pack(side="right", padx=(0, 5), ipady=3, ipadx=5)
+
+        # Type-ahead filter
+        self.watchlist_filter = tk.Entry(parent, font=("Calibri", 10), bg=BG_LIGHT, fg=WHITE,
+                                         insertbackground=WHITE, relief="flat")
+        self.watchlist_filter.pack(fill="x", padx=15, pady=(0, 5), ipady=3)
+        self.watchlist_filter.bind("<KeyRelease>", lambda e: self._refresh_watchlist())
+
+        # Watchlist listbox (only the visible tickers are loaded)
         wl_frame = tk.Frame(parent, bg=BG_MID)
         wl_frame.pack(fill="both", expand=True, padx=15, pady=(0, 15))
 
-        self.watchlist_box = tk.Listbox(wl_frame, bg=BG_LIGHT, fg=TEXT,
+        wl_scroll = tk.Scrollbar(wl_frame, orient="vertical")
+        wl_scroll.pack(side="right", fill="y")
+        self.watchlist_box = VirtualList(wl_frame, scrollbar=wl_scroll, format=lambda t: f"  {t}",
+                                         bg=BG_LIGHT, fg=TEXT,
                                          font=("Calibri", 10), relief="flat",
                                          selectbackground=ACCENT, selectforeground=WHITE,
                                          activestyle="none", cursor="hand2")
         self.watchlist_box.pack(fill="both", expand=True)
         self.watchlist_box.bind("<Double-Button-1>", self._load_from_watchlist)
+        self.watchlist_prefix = None
         self._refresh_watchlist()
 
     def _build_right_panel(self, parent):
@@ -146,20 +201,12 @@ class EarningsAnalyzer(tk.Tk):
             tk.Label(card, textvariable=var, font=("Calibri", 14, "bold"),
                      bg=BG_MID, fg=WHITE).pack(anchor="w")
 
-        # Chart
-        chart_frame = tk.Frame(parent, bg=BG_MID)
-        chart_frame.pack(fill="both", expand=True, pady=(0, 10))
-
-        self.fig, self.ax = plt.subplots(figsize=(8, 3.5))
-        self.fig.patch.set_facecolor(BG_MID)
-        self.ax.set_facecolor(BG_LIGHT)
-        self.ax.set_title("Post-Earnings Price Moves", color=TEXT, fontsize=11)
-        self.ax.tick_params(colors=TEXT)
-        for spine in self.ax.spines.values():
-            spine.set_edgecolor(BG_LIGHT)
-
-        self.canvas = FigureCanvasTkAgg(self.fig, master=chart_frame)
-        self.canvas.get_tk_widget().pack(fill="both", expand=True, padx=10, pady=10)
+        # Chart (the matplotlib canvas is added by _build_chart once matplotlib has loaded)
+        self.chart_frame = tk.Frame(parent, bg=BG_MID)
+        self.chart_frame.pack(fill="both", expand=True, pady=(0, 10))
+        self.chart_placeholder = tk.Label(self.chart_frame, text="Loading chart...",
+                                          font=("Calibri", 10), bg=BG_MID, fg=TEXT_DIM)
+        self.chart_placeholder.pack(fill="both", expand=True)
 
         # History table
         table_frame = tk.Frame(parent, bg=BG_MID)
@@ -169,7 +216,13 @@ class EarningsAnalyzer(tk.Tk):
                  bg=BG_MID, fg=ACCENT).pack(anchor="w", padx=10, pady=(8, 4))
 
         cols = ("Date", "Move %", "EPS Estimate", "EPS Actual", "Beat EPS")
-        self.tree = ttk.Treeview(table_frame, columns=cols, show="headings", height=5)
+        tree_frame = tk.Frame(table_frame, bg=BG_MID)
+        tree_frame.pack(fill="x", padx=10, pady=(0, 10))
+        tree_scroll = ttk.Scrollbar(tree_frame, orient="vertical")
+        tree_scroll.pack(side="right", fill="y")
+        # Only the visible rows exist as items; rows are result dicts, formatted as they scroll into view
+        self.tree = VirtualTable(tree_frame, scrollbar=tree_scroll, format=self._result_values,
+                                 columns=cols, show="headings", height=5)
 
         style = ttk.Style()
         style.theme_use("clam")
@@ -183,7 +236,7 @@ class EarningsAnalyzer(tk.Tk):
             self.tree.heading(col, text=col)
             self.tree.column(col, width=120, anchor="center")
 
-        self.tree.pack(fill="x", padx=10, pady=(0, 10))
+        self.tree.pack(side="left", fill="x", expand=True)
 
     def _run_analysis(self):
         ticker = self.ticker_entry.get().strip().upper()
@@ -191,23 +244,38 @@ class EarningsAnalyzer(tk.Tk):
             messagebox.showwarning("Input Required", "Please enter a ticker symbol.")
             return
 
+        lookback = self.lookback_var.get()
         self.status_var.set(f"Fetching data for {ticker}...")
         self._clear_display()
 
-        def fetch():
-            summary = analyze_ticker(ticker, lookback=self.lookback_var.get())
-            self.after(0, lambda: self._display_results(ticker, summary))
+        def fetch(report, cancelled):
+            from data_fetcher import analyze_ticker
+            return analyze_ticker(ticker, lookback=lookback, on_result=report, cancelled=cancelled)
 
-        threading.Thread(target=fetch, daemon=True).start()
+        # Replaces (and stops) any analysis still in flight; a repeat of the same one merges
+        self.jobs.submit("analysis", (ticker, lookback), fetch,
+                         lambda summary: self._display_results(ticker, summary),
+                         on_progress=lambda result: self._queue_result(ticker, result),
+                         cancellable=True)
+
+    def _on_lookback_change(self):
+        # Re-run the ticker on screen; smaller lookbacks come straight from the results cache
+        if self.current_summary and self.ticker_entry.get().strip():
+            self._run_analysis()
 
     def _display_results(self, ticker, summary):
+        self._reset_stream()
         if summary is None:
             self.status_var.set(f"No data found for {ticker}")
             return
 
         self.current_summary = summary
         self.status_var.set(f"Analysis complete for {ticker}")
+        self._show_summary(ticker, summary)
+        set_app_state("last_ticker", ticker)
+        set_app_state("last_lookback", str(self.lookback_var.get()))
 
+    def _show_summary(self, ticker, summary):
         # Update cards
         self.card_vars["ticker"].set(summary["ticker"])
         self.card_vars["avg_abs_move"].set(f"{summary['avg_abs_move']:.2f}%")
@@ -218,90 +286,290 @@ class EarningsAnalyzer(tk.Tk):
         self.card_vars["earnings_analyzed"].set(str(summary["earnings_analyzed"]))
 
         # Update chart
-        self.ax.clear()
-        self.ax.set_facecolor(BG_LIGHT)
-        results = summary["results"]
-        dates = [r["date"] for r in results]
-        dates = dates[::-1]
-        moves = [r["move_pct"] for r in results]
-        moves = moves[::-1]
-        colors = [GREEN if m >= 0 else RED for m in moves]
-
-        bars = self.ax.bar(range(len(moves)), moves, color=colors, width=0.6, zorder=3)
-        self.ax.axhline(y=0, color=TEXT_DIM, linewidth=0.8, zorder=2)
-        self.ax.set_xticks(range(len(dates)))
-        self.ax.set_xticklabels(dates, rotation=35, ha="right", fontsize=8, color=TEXT)
-        self.ax.set_ylabel("Move %", color=TEXT, fontsize=9)
-        self.ax.set_title(f"{ticker} — Post-Earnings Price Moves", color=TEXT, fontsize=11)
-        self.ax.tick_params(colors=TEXT)
-        self.ax.yaxis.grid(True, color=BG_DARK, linewidth=0.5, zorder=1)
-        for spine in self.ax.spines.values():
-            spine.set_edgecolor(BG_MID)
-
-        # Value labels on bars
-        for bar, move in zip(bars, moves):
-            self.ax.text(bar.get_x() + bar.get_width() / 2,
-                         bar.get_height() + (0.1 if move >= 0 else -0.3),
-                         f"{move:+.1f}%", ha="center", va="bottom" if move >= 0 else "top",
-                         fontsize=7, color=TEXT)
-
-        self.fig.tight_layout()
-        self.canvas.draw()
+        self._draw_chart(ticker, summary["results"])
 
         # Update table
-        for row in self.tree.get_children():
-            self.tree.delete(row)
-
-        history = get_earnings_history(ticker)
-        for row in history:
-            _, date, exp_move, act_move, beat_exp, eps_est, eps_act, beat_eps, notes = row
-            beat_str = "✓" if beat_eps == 1 else ("✗" if beat_eps == 0 else "--")
-            eps_est_str = f"{eps_est:.2f}" if eps_est else "--"
-            eps_act_str = f"{eps_act:.2f}" if eps_act else "--"
-            move_str = f"{act_move:+.2f}%" if act_move else "--"
-            self.tree.insert("", "end", values=(date, move_str, eps_est_str, eps_act_str, beat_str))
+        with metrics.stage("table_fill"):
+            self.tree.set_rows(summary["results"])
+
+    def _result_values(self, result):
+        eps_est = _eps_float(result["eps_estimate"])
+        eps_act = _eps_float(result["eps_actual"])
+        beat_eps = (1 if eps_act >= eps_est else 0) if eps_est and eps_act else None
+        return self._table_values(result["date"], result["move_pct"], eps_est, eps_act, beat_eps)
+
+    def _table_values(self, date, act_move, eps_est, eps_act, beat_eps):
+        beat_str = "✓" if beat_eps == 1 else ("✗" if beat_eps == 0 else "--")
+        eps_est_str = f"{eps_est:.2f}" if eps_est else "--"
+        eps_act_str = f"{eps_act:.2f}" if eps_act else "--"
+        move_str = f"{act_move:+.2f}%" if act_move else "--"
+        return (date, move_str, eps_est_str, eps_act_str, beat_str)
+
+    def _draw_chart(self, ticker, results):
+        if self.chart is None:
+            return  # drawn by _build_chart once matplotlib is ready
+        from earnings_series import EarningsSeries
+        if not isinstance(results, EarningsSeries):
+            results = EarningsSeries.from_results(ticker, results)  # streamed result dicts
+        results = results.oldest_first()
+        with metrics.stage("chart_render"):
+            self.chart.update(ticker, list(results.dates), results.moves)
+
+    def _queue_result(self, ticker, result):
+        # Streamed results are buffered and drawn together, at most once per STREAM_FLUSH_MS
+        self.streamed_results.append(result)
+        self.pending_rows.append(result)
+        if self.flush_scheduled is None:
+            self.flush_scheduled = self.after(STREAM_FLUSH_MS, lambda: self._flush_results(ticker))
+
+    def _flush_results(self, ticker):
+        self.flush_scheduled = None
+        rows, self.pending_rows = self.pending_rows, []
+        if not rows:
+            return
+
+        self.status_var.set(f"Fetching data for {ticker}... {len(self.streamed_results)} earnings so far")
+        self._draw_chart(ticker, self.streamed_results)
+        with metrics.stage("table_fill"):
+            self.tree.refresh()
+
+    def _reset_stream(self):
+        if self.flush_scheduled is not None:
+            self.after_cancel(self.flush_scheduled)
+        self.flush_scheduled = None
+        self.streamed_results = []
+        self.pending_rows = []
 
     def _clear_display(self):
+        self._reset_stream()
         for key in self.card_vars:
             self.card_vars[key].set("--")
-        self.ax.clear()
-        self.ax.set_facecolor(BG_LIGHT)
-        self.ax.set_title("Post-Earnings Price Moves", color=TEXT, fontsize=11)
-        self.canvas.draw()
-        for row in self.tree.get_children():
-            self.tree.delete(row)
+        if self.chart:
+            self.chart.clear()
+        # Streamed results are shown as they arrive (see _flush_results)
+        self.tree.set_rows(self.streamed_results)
 
     def _refresh_watchlist(self):
-        self.watchlist_box.delete(0, tk.END)
-        for row in get_watchlist():
-            self.watchlist_box.insert(tk.END, f"  {row[0]}")
+        # Each keystroke in the filter runs a count and one page of an indexed prefix query
+        prefix = self.watchlist_filter.get().strip().upper()
+        if prefix == self.watchlist_prefix:
+            return
+        self.watchlist_prefix = prefix
+        with metrics.stage("watchlist_filter"):
+            self.watchlist_box.set_rows(QueryRows(
+                lambda: count_watchlist(prefix),
+                lambda offset, limit: search_watchlist(prefix, offset, limit)))
 
     def _add_to_watchlist(self):
         ticker = self.ticker_entry.get().strip().upper()
         if not ticker:
             messagebox.showwarning("Input Required", "Enter a ticker first.")
             return
-        add_to_watchlist(ticker)
-        self._refresh_watchlist()
+        if add_to_watchlist(ticker):
+            # Only lines whose ticker changed are redrawn; the new ticker is scrolled into view
+            self.watchlist_box.refresh()
+            if ticker.startswith(self.watchlist_prefix):
+                self.watchlist_box.see(count_watchlist(self.watchlist_prefix, before=ticker))
 
     def _remove_from_watchlist(self):
-        selection = self.watchlist_box.curselection()
-        if not selection:
+        ticker = self.watchlist_box.selected()
+        if not ticker:
             messagebox.showwarning("Select Ticker", "Select a ticker from the watchlist first.")
             return
-        ticker = self.watchlist_box.get(selection[0]).strip()
-        remove_from_watchlist(ticker)
-        self._refresh_watchlist()
+        if remove_from_watchlist(ticker):
+            self.watchlist_box.selected_index = None
+            self.watchlist_box.refresh()
+
+    def _scan_watchlist(self):
+        if not get_watchlist():
+            messagebox.showwarning("Empty Watchlist", "Add tickers to the watchlist first.")
+            return
+
+        lookback = self.lookback_var.get()
+        self.status_var.set("Scanning watchlist...")
+
+        def progress(done, total, ticker, summary):
+            self.after(0, lambda: self.status_var.set(f"Scanning watchlist... {done}/{total} ({ticker})"))
+
+        def scan():
+            from scanner import scan_watchlist
+            return scan_watchlist(lookback=lookback, on_progress=progress)
+
+        self.jobs.submit("scan", lookback, scan,
+                         lambda ranking: self._show_scan_results(ranking or []))
+
+    def _compare_watchlist(self):
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from matplotlib.figure import Figure
+        from chart import draw_move_distributions
+        from stats import load_earnings_history
+
+        tickers = [row[0] for row in get_watchlist()]
+        if not tickers:
+            messagebox.showwarning("Empty Watchlist", "Add tickers to the watchlist first.")
+            return
+
+        # Saved history only, no network: tickers never analyzed are left out
+        history = load_earnings_history(tickers)
+        grouped = history.groupby("ticker")["actual_move_pct"]
+        order = grouped.apply(lambda m: m.abs().mean()).sort_values().index
+        moves_by_ticker = [(ticker, grouped.get_group(ticker).to_numpy()) for ticker in order]
+
+        window = tk.Toplevel(self)
+        window.title("Watchlist Comparison — Move Distributions")
+        window.geometry("1000x520")
+        window.configure(bg=BG_DARK)
+
+        fig = Figure(figsize=(10, 4.5))
+        fig.patch.set_facecolor(BG_MID)
+        ax = fig.add_subplot(111)
+        fig.subplots_adjust(left=0.06, right=0.98, top=0.92, bottom=0.18)
+        draw_move_distributions(ax, moves_by_ticker)
+
+        canvas = FigureCanvasTkAgg(fig, master=window)
+        canvas.get_tk_widget().pack(fill="both", expand=True, padx=10, pady=10)
+        canvas.draw_idle()
+
+    def _on_first_paint(self):
+        self.startup_times["window"] = time.perf_counter() - START_TIME
+        self.jobs.submit("warmup", "imports", _warm_imports, lambda _: self._on_warm())
+
+    def _on_warm(self):
+        self._build_chart()
+        self._restore_last_view()
+        self.startup_times["interactive"] = time.perf_counter() - START_TIME
+        self._report_startup()
+        self._check_new_reports()
+
+    def _check_new_reports(self):
+        # One scheduler pass in the background; does nothing unless a watchlist ticker has reported
+        def check():
+            from scheduler import run_pass
+            return run_pass()
+
+        self.jobs.submit("reports", "pass", check, self._on_new_reports)
+
+    def _on_new_reports(self, tickers):
+        if tickers:
+            self.status_var.set(f"New earnings saved for {', '.join(tickers)}")
+
+    def _build_chart(self):
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from matplotlib.figure import Figure
+        from chart import MoveChart
+
+        self.fig = Figure(figsize=(8, 3.5))
+        self.fig.patch.set_facecolor(BG_MID)
+        self.ax = self.fig.add_subplot(111)
+
+        self.chart_placeholder.destroy()
+        self.canvas = FigureCanvasTkAgg(self.fig, master=self.chart_frame)
+        self.canvas.get_tk_widget().pack(fill="both", expand=True, padx=10, pady=10)
+        self.chart = MoveChart(self.ax, self.canvas)
+
+        # An analysis may have finished (or started streaming) before the chart existed
+        if self.streamed_results:
+            self._draw_chart(self.ticker_entry.get().strip().upper(), self.streamed_results)
+        elif self.current_summary:
+            self._draw_chart(self.current_summary["ticker"], self.current_summary["results"])
+
+    def _restore_last_view(self):
+        # Rebuilt from the saved earnings history only; no network calls
+        from data_fetcher import summarize_results
+        from earnings_series import EarningsSeries
+
+        ticker = get_app_state("last_ticker")
+        if not ticker or self.current_summary or self.ticker_entry.get().strip():
+            return
+        lookback = int(get_app_state("last_lookback") or self.lookback_var.get())
+        rows = [row for row in get_earnings_history(ticker) if row[3] is not None][:lookback]
+        if not rows:
+            return
+
+        results = EarningsSeries.from_history_rows(ticker, rows)
+        self.lookback_var.set(lookback)
+        self.ticker_entry.insert(0, ticker)
+        self.current_summary = summarize_results(ticker, results)
+        self.status_var.set(f"Showing saved analysis for {ticker}")
+        self._show_summary(ticker, self.current_summary)
+
+    def _report_startup(self):
+        times = self.startup_times
+        metrics.emit("startup", f"Startup: window shown in {times['window']:.2f}s, "
+                                f"interactive in {times['interactive']:.2f}s", **times)
+
+    def _update_job_status(self, queued, running):
+        if not queued and not running:
+            self.job_status_var.set("Idle")
+        else:
+            self.job_status_var.set(f"Jobs: {running} running, {queued} queued")
+
+    def _show_scan_results(self, ranking):
+        from scanner import RANK_FIELDS
+
+        self.status_var.set(f"Scan complete — {len(ranking)} tickers ranked")
+
+        window = tk.Toplevel(self)
+        window.title("Watchlist Scan — Ranked by Avg Abs Move")
+        window.geometry("760x480")
+        window.configure(bg=BG_DARK)
+
+        cols = ("Ticker", "Avg Abs Move", "Avg Move", "Largest", "Smallest", "Analyzed", "Up", "Down")
+        tree = ttk.Treeview(window, columns=cols, show="headings")
+        for col, field in zip(cols, RANK_FIELDS):
+            tree.heading(col, text=col, command=lambda f=field: fill(f))
+            tree.column(col, width=90, anchor="center")
+        tree.pack(fill="both", expand=True, padx=10, pady=10)
+
+        sort_state = {"key": "avg_abs_move", "descending": False}
+
+        def fill(key):
+            # Clicking the sorted column again flips the direction
+            if key == sort_state["key"]:
+                sort_state["descending"] = not sort_state["descending"]
+            else:
+                sort_state.update(key=key, descending=False)
+            for row in tree.get_children():
+                tree.delete(row)
+            rows = sorted(ranking, key=lambda r: r[key], reverse=sort_state["descending"])
+            for r in rows:
+                tree.insert("", "end", values=(
+                    r["ticker"], f"{r['avg_abs_move']:.2f}%", f"{r['avg_move']:+.2f}%",
+                    f"{r['max_move']:+.2f}%", f"{r['min_move']:+.2f}%", r["earnings_analyzed"],
+                    r["positive_reactions"], r["negative_reactions"]))
+
+        def open_ticker(event):
+            selection = tree.selection()
+            if selection:
+                self.ticker_entry.delete(0, tk.END)
+                self.ticker_entry.insert(0, tree.item(selection[0])["values"][0])
+                self._run_analysis()
+
+        tree.bind("<Double-Button-1>", open_ticker)
+        sort_state["descending"] = True  # first fill() flips this back to ascending
+        fill("avg_abs_move")
 
     def _load_from_watchlist(self, event):
-        selection = self.watchlist_box.curselection()
-        if selection:
-            ticker = self.watchlist_box.get(selection[0]).strip()
+        ticker = self.watchlist_box.selected()
+        if ticker:
             self.ticker_entry.delete(0, tk.END)
             self.ticker_entry.insert(0, ticker)
             self._run_analysis()
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Earnings Analyzer")
+    parser.add_argument("--profile", nargs="?", const="", metavar="PATH",
+                        help="time every stage and print a report on exit (or write it to PATH)")
+    parser.add_argument("--events", metavar="PATH", help="write progress events to PATH as JSON lines")
+    args = parser.parse_args()
+    if args.events:
+        metrics.configure(sink="json", path=args.events)
+    if args.profile is not None:
+        metrics.configure(timing=True)
+
+    init_db()
     app = EarningsAnalyzer()
-    app.mainloop()
\ No newline at end of file
+    app.mainloop()
+    if args.profile is not None:
+        metrics.dump_report(args.profile or None)
\ No newline at end of file
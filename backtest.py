@@ -0,0 +1,198 @@
+"""
+Calendar-spread backtest over the saved earnings_history dataset.
+
+Each event is an ATM calendar opened before the report (short the front-month
+call, long the back-month call at the same strike) and closed when the front
+expires. Front IV is implied from the expected move, back IV is a fixed ratio
+of it and is crushed by a fixed fraction after the report; prices are
+Black-Scholes with zero rates. P&L is returned as a fraction of the debit paid.
+
+    python backtest.py          # default parameters plus a small sweep
+"""
+import itertools
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import database
+from stats import load_earnings_history
+
+DAYS_PER_YEAR = 365
+
+# Model parameters; every key can be swept with param_grid
+DEFAULT_PARAMS = {
+    "front_days": 3,             # days from entry to front expiration (the exit)
+    "back_days": 30,             # days from entry to back expiration
+    "back_iv_ratio": 0.55,       # back-month IV as a fraction of front-month IV before the report
+    "back_crush": 0.15,          # fraction of back-month IV lost after the report
+    "expected_move_pct": None,   # used for events without a stored expected move (None skips them)
+    "slippage_pct": 2.0,         # paid on the debit at entry and on the value at exit
+}
+
+# Events per parameter set below which a sweep isn't worth splitting across processes
+PARALLEL_MIN_EVALUATIONS = 2_000_000
+
+
+def _norm_cdf(x):
+    # Abramowitz-Stegun 7.1.26 erf (max error 1.5e-7); avoids a scipy dependency
+    z = np.abs(x) / np.sqrt(2)
+    t = 1 / (1 + 0.3275911 * z)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    erf = 1 - poly * np.exp(-z * z)
+    return 0.5 * (1 + np.sign(x) * erf)
+
+
+def _call(spot, vol, years):
+    """Black-Scholes call with strike 1 and zero rates, elementwise."""
+    vol_t = np.maximum(vol * np.sqrt(years), 1e-12)
+    d1 = (np.log(spot) + vol_t * vol_t / 2) / vol_t
+    return spot * _norm_cdf(d1) - _norm_cdf(d1 - vol_t)
+
+
+def simulate_events(actual_moves, expected_moves, params):
+    """
+    Calendar P&L as a fraction of the debit for every event and parameter set at
+    once. actual_moves and expected_moves are per-event percent arrays (NaN
+    expected moves fall back to each parameter set's expected_move_pct).
+    params is a list of dicts. Returns a (len(params), events) array; events that
+    can't be traded (no expected move, or a non-positive debit) are NaN.
+    """
+    table = pd.DataFrame([{**DEFAULT_PARAMS, **p} for p in params])
+    column = lambda name: table[name].to_numpy(dtype=float)[:, None]
+    front_t = column("front_days") / DAYS_PER_YEAR
+    back_t = column("back_days") / DAYS_PER_YEAR
+    slippage = column("slippage_pct") / 100
+
+    actual = np.asarray(actual_moves, dtype=float)[None, :]
+    expected = np.abs(np.asarray(expected_moves, dtype=float))[None, :]
+    expected = np.where(np.isnan(expected), column("expected_move_pct"), expected)
+
+    # ATM straddle ~= 0.8 * vol * sqrt(T), so the expected move pins down the front IV
+    front_iv = expected / 100 / (np.sqrt(2 / np.pi) * np.sqrt(front_t))
+    back_iv = front_iv * column("back_iv_ratio")
+
+    debit = _call(1.0, back_iv, back_t) - _call(1.0, front_iv, front_t)
+    spot = 1 + actual / 100
+    value = _call(spot, back_iv * (1 - column("back_crush")), back_t - front_t) - np.maximum(spot - 1, 0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pnl = (value * (1 - slippage) - debit * (1 + slippage)) / debit
+    return np.where(debit > 0, pnl, np.nan)
+
+
+def load_events(tickers=None):
+    """Saved earnings events with an actual move, oldest first."""
+    events = load_earnings_history(tickers)
+    events = events.sort_values(["earnings_date", "ticker"], kind="stable").reset_index(drop=True)
+    events["earnings_date"] = pd.to_datetime(events["earnings_date"])
+    return events
+
+
+def run_backtest(events, params=None, trade_size=1000.0, capital=10000.0):
+    """
+    Backtest one parameter set, risking trade_size of debit on every event.
+    Returns {"events": events with a pnl column, "tickers": {ticker: equity Series},
+    "portfolio": equity Series, "summary": dict}. Equity curves are indexed by
+    earnings date and start from capital.
+    """
+    pnl = simulate_events(events["actual_move_pct"], events["expected_move_pct"], [params or {}])[0]
+    traded = events.assign(pnl=pnl * trade_size).dropna(subset=["pnl"])
+
+    by_date = traded.groupby("earnings_date")["pnl"].sum()
+    portfolio = capital + by_date.cumsum()
+    tickers = {
+        ticker: capital + group.set_index("earnings_date")["pnl"].cumsum()
+        for ticker, group in traded.groupby("ticker", sort=True)
+    }
+    return {
+        "events": traded,
+        "tickers": tickers,
+        "portfolio": portfolio,
+        "summary": _summary(pnl[None, :], capital, trade_size, _date_ends(events))[0],
+    }
+
+
+def _date_ends(events):
+    """Position of the last event on each earnings date (events are in date order)."""
+    dates = events["earnings_date"].to_numpy()
+    return np.flatnonzero(np.append(dates[1:] != dates[:-1], True)) if len(dates) else np.array([], dtype=int)
+
+
+def _summary(pnl, capital, trade_size, date_ends):
+    """Per-parameter-set totals for a (params, events) P&L array in date order."""
+    traded = ~np.isnan(pnl)
+    dollars = np.where(traded, pnl, 0) * trade_size
+
+    # Portfolio equity per parameter set after each date, events on the same date booked together
+    equity = capital + np.cumsum(dollars, axis=1)[:, date_ends]
+    peak = np.maximum(np.maximum.accumulate(equity, axis=1), capital)
+    drawdown = (peak - equity) / peak
+
+    trades = traded.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rows = {
+            "trades": trades,
+            "total_pnl": dollars.sum(axis=1).round(2),
+            "avg_return_pct": (np.nanmean(np.where(traded, pnl, np.nan), axis=1) * 100).round(2),
+            "win_rate_pct": ((pnl > 0).sum(axis=1) / trades * 100).round(1),
+            "max_drawdown_pct": (drawdown.max(axis=1, initial=0) * 100).round(2),
+        }
+    return [dict(zip(rows, values)) for values in zip(*rows.values())]
+
+
+def _sweep_chunk(actual, expected, date_ends, params, capital, trade_size):
+    pnl = simulate_events(actual, expected, params)
+    return _summary(pnl, capital, trade_size, date_ends)
+
+
+def param_grid(**axes):
+    """Every combination of the given parameter values, e.g. param_grid(back_crush=[0.1, 0.2])."""
+    names = list(axes)
+    return [dict(zip(names, values)) for values in itertools.product(*axes.values())]
+
+
+def sweep(events, grid, trade_size=1000.0, capital=10000.0, workers=None):
+    """
+    Backtest every parameter set in grid over events in date order (as from
+    load_events). Large sweeps are split across a process pool. Returns one
+    row per parameter set: the parameters followed by trades, total_pnl,
+    avg_return_pct, win_rate_pct and max_drawdown_pct.
+    """
+    actual = events["actual_move_pct"].to_numpy(dtype=float)
+    expected = events["expected_move_pct"].to_numpy(dtype=float)
+    date_ends = _date_ends(events)
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(grid) * len(events) < PARALLEL_MIN_EVALUATIONS:
+        rows = _sweep_chunk(actual, expected, date_ends, grid, capital, trade_size)
+    else:
+        size = -(-len(grid) // workers)
+        chunks = [grid[i:i + size] for i in range(0, len(grid), size)]
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=len(chunks), mp_context=context) as pool:
+            results = pool.map(_sweep_chunk, *zip(*[(actual, expected, date_ends, chunk, capital, trade_size)
+                                                   for chunk in chunks]))
+            rows = [row for chunk_rows in results for row in chunk_rows]
+
+    params = pd.DataFrame([{**DEFAULT_PARAMS, **p} for p in grid])
+    return pd.concat([params, pd.DataFrame(rows)], axis=1)
+
+
+if __name__ == "__main__":
+    database.init_db()
+    events = load_events()
+    if events.empty:
+        print("No earnings history saved yet.")
+    else:
+        params = {"expected_move_pct": 5.0}
+        result = run_backtest(events, params)
+        print(f"Backtested {result['summary']['trades']} of {len(events)} events")
+        for key, value in result["summary"].items():
+            print(f"  {key}: {value}")
+
+        grid = param_grid(back_iv_ratio=[0.45, 0.55, 0.65], back_crush=[0.1, 0.2, 0.3],
+                          expected_move_pct=[5.0])
+        print("\n" + sweep(events, grid).sort_values("total_pnl", ascending=False).to_string(index=False))
@@ -0,0 +1,307 @@
+"""
+End-to-end benchmarks against recorded provider data.
+
+    python benchmark.py record fixtures/ AAPL MSFT NVDA   # save live Yahoo responses
+    python benchmark.py synth fixtures/ --tickers 50      # or generate synthetic fixtures offline
+    python benchmark.py run fixtures/                     # run and compare with the baseline
+    python benchmark.py run fixtures/ --save-baseline     # store this run as the baseline
+
+Every benchmark gets a fresh temporary database and reads its data from a
+ReplayProvider, so runs are repeatable offline (--latency adds a simulated
+network delay per request). The baseline is fixtures/baseline.json unless
+--baseline is given; a result more than --tolerance worse than it is reported
+as a regression and makes `run` exit with status 1.
+"""
+import argparse
+import contextlib
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import data_fetcher
+import database
+import metrics
+from providers import FixtureStore, RecordingProvider, ReplayProvider
+from summary_cache import invalidate_results
+
+# name: (unit, whether bigger is better)
+BENCHMARKS = {
+    "analysis_cold_ms": ("ms", False),        # median analyze_ticker with empty caches
+    "analysis_cached_ms": ("ms", False),      # median analyze_ticker served from the database caches
+    "scan_tickers_per_s": ("tickers/s", True),
+    "ingest_earnings_rows_per_s": ("rows/s", True),
+    "ingest_price_rows_per_s": ("rows/s", True),
+    "chart_render_ms": ("ms", False),
+}
+
+# Allowed slowdown against the baseline before a result counts as a regression
+DEFAULT_TOLERANCE = 0.25
+
+# Times each benchmark is run; the best result is kept, as timeit does, to damp noise from other load
+DEFAULT_REPEAT = 3
+
+# Synthetic rows written by the ingest benchmarks
+INGEST_TICKERS = 200
+INGEST_EARNINGS_PER_TICKER = 40
+INGEST_PRICE_DAYS = 500
+
+
+@contextlib.contextmanager
+def fresh_database():
+    """Point the database module at an empty temporary database for the duration."""
+    folder = tempfile.mkdtemp(prefix="benchmark-")
+    old_path = database.DB_PATH
+    database.DB_PATH = os.path.join(folder, "benchmark.db")
+    invalidate_results()
+    try:
+        database.init_db()
+        yield
+    finally:
+        database.close_connection()
+        database.DB_PATH = old_path
+        invalidate_results()
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+@contextlib.contextmanager
+def using_provider(provider):
+    old = data_fetcher.set_provider(provider)
+    try:
+        yield provider
+    finally:
+        data_fetcher.set_provider(old)
+
+
+def _timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    fn(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def bench_analysis(tickers, lookback):
+    """Median per-ticker analysis time, first with empty caches and then from the database."""
+    with fresh_database():
+        cold = [_timed(data_fetcher.analyze_ticker, ticker, lookback) for ticker in tickers]
+        cached = []
+        for ticker in tickers:
+            invalidate_results(ticker)
+            cached.append(_timed(data_fetcher.analyze_ticker, ticker, lookback))
+    return {"analysis_cold_ms": statistics.median(cold) * 1000,
+            "analysis_cached_ms": statistics.median(cached) * 1000}
+
+
+def bench_scan(tickers, lookback):
+    """Watchlist scan throughput with empty caches."""
+    from scanner import scan_tickers
+
+    with fresh_database():
+        elapsed = _timed(scan_tickers, tickers, lookback)
+    return {"scan_tickers_per_s": len(tickers) / elapsed}
+
+
+def bench_ingest(seed=0):
+    """Rows per second written by save_earnings_batch and save_price_history."""
+    rng = np.random.default_rng(seed)
+    report_days = pd.date_range("2010-01-01", periods=INGEST_EARNINGS_PER_TICKER, freq="91D").strftime("%Y-%m-%d")
+    price_days = pd.bdate_range("2020-01-01", periods=INGEST_PRICE_DAYS).strftime("%Y-%m-%d")
+
+    with fresh_database():
+        earnings_time = price_time = 0.0
+        for i in range(INGEST_TICKERS):
+            ticker = f"ING{i:03d}"
+            moves = rng.normal(0, 5, len(report_days))
+            records = [dict(earnings_date=day, actual_move_pct=float(move), eps_estimate=1.0, eps_actual=1.1)
+                       for day, move in zip(report_days, moves)]
+            closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, len(price_days))))
+            bars = [(day, close, close * 1.01, close * 0.99, close, 1e6) for day, close in zip(price_days, closes.tolist())]
+            earnings_time += _timed(database.save_earnings_batch, ticker, records)
+            price_time += _timed(database.save_price_history, ticker, bars)
+    return {"ingest_earnings_rows_per_s": INGEST_TICKERS * len(report_days) / earnings_time,
+            "ingest_price_rows_per_s": INGEST_TICKERS * len(price_days) / price_time}
+
+
+def bench_chart(repeat=30, seed=0):
+    """Median time to update and draw the move chart, alternating between 8 and 12 bars."""
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from chart import MoveChart
+
+    rng = np.random.default_rng(seed)
+    figure = Figure(figsize=(8, 3.5))
+    canvas = FigureCanvasAgg(figure)
+    chart = MoveChart(figure.add_subplot(111), canvas)
+    dates = pd.date_range("2022-01-01", periods=12, freq="91D").strftime("%Y-%m-%d").tolist()
+    series = [rng.normal(0, 5, 8), rng.normal(0, 5, 12)]
+
+    times = []
+    for i in range(repeat):
+        moves = series[i % 2]
+        start = time.perf_counter()
+        chart.update("BENCH", dates[:len(moves)], moves)
+        canvas.draw()
+        times.append(time.perf_counter() - start)
+    return {"chart_render_ms": statistics.median(times) * 1000}
+
+
+def _keep_best(results, new):
+    for name, value in new.items():
+        if name not in results:
+            results[name] = value
+        else:
+            results[name] = max(results[name], value) if BENCHMARKS[name][1] else min(results[name], value)
+
+
+def run_suite(directory, tickers=None, lookback=8, latency=0.0, repeat=DEFAULT_REPEAT):
+    """Run every benchmark `repeat` times against the fixtures in directory. Returns {name: best value}."""
+    tickers = tickers or FixtureStore(directory).tickers()
+    if not tickers:
+        raise ValueError(f"No fixtures in {directory}; run `record` or `synth` first")
+
+    results = {}
+    for _ in range(repeat):
+        # A new provider per benchmark, so each one reads its fixtures from disk
+        with using_provider(ReplayProvider(directory, latency=latency)):
+            _keep_best(results, bench_analysis(tickers, lookback))
+        with using_provider(ReplayProvider(directory, latency=latency)):
+            _keep_best(results, bench_scan(tickers, lookback))
+        _keep_best(results, bench_ingest())
+        _keep_best(results, bench_chart())
+    return results
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Rows of (name, value, unit, baseline value or None, relative change or None,
+    regressed) for every result. Changes are signed so that positive is better.
+    """
+    rows = []
+    for name, value in results.items():
+        unit, bigger_is_better = BENCHMARKS[name]
+        base = baseline.get(name)
+        if not base:
+            rows.append((name, value, unit, None, None, False))
+            continue
+        change = (value - base) / base if bigger_is_better else (base - value) / base
+        rows.append((name, value, unit, base, change, change < -tolerance))
+    return rows
+
+
+def format_comparison(rows):
+    lines = [f"{'benchmark':<28} {'value':>12} {'unit':<10} {'baseline':>12} {'change':>8}"]
+    for name, value, unit, base, change, regressed in rows:
+        base_str = f"{base:>12.2f}" if base is not None else f"{'--':>12}"
+        change_str = f"{change * 100:>+7.1f}%" if change is not None else f"{'--':>8}"
+        lines.append(f"{name:<28} {value:>12.2f} {unit:<10} {base_str} {change_str}"
+                     + ("  REGRESSION" if regressed else ""))
+    return "\n".join(lines)
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def save_baseline(path, results):
+    with open(path, "w") as f:
+        json.dump({"created": datetime.now().isoformat(timespec="seconds"), "results": results}, f, indent=2)
+
+
+def record_fixtures(directory, tickers, lookback=8):
+    """Analyze tickers against the live provider, saving every response under directory."""
+    with fresh_database(), using_provider(RecordingProvider(directory)):
+        for ticker in tickers:
+            data_fetcher.analyze_ticker(ticker, lookback)
+
+
+def synthesize_fixtures(directory, tickers=50, cycles=16, seed=0):
+    """
+    Write random but reproducible fixtures for `tickers` made-up symbols: quarterly
+    reports (the newest one upcoming) and daily bars with a jump after each report.
+    """
+    rng = np.random.default_rng(seed)
+    store = FixtureStore(directory)
+    today = pd.Timestamp.now().normalize()
+
+    for i in range(tickers):
+        ticker = f"SYN{i:03d}"
+        reports = pd.DatetimeIndex([pd.offsets.BDay().rollforward(today + pd.Timedelta(days=30 - 91 * k))
+                                    for k in range(cycles + 1)]) + pd.Timedelta(hours=16)
+        estimates = rng.normal(1.5, 0.5, len(reports)).round(2)
+        actuals = (estimates + rng.normal(0.05, 0.2, len(reports))).round(2)
+        actuals[0] = np.nan  # the upcoming report
+        earnings = pd.DataFrame({"EPS Estimate": estimates, "Reported EPS": actuals,
+                                 "Surprise(%)": ((actuals - estimates) / estimates * 100).round(2)},
+                                index=reports.tz_localize("America/New_York").rename("Earnings Date"))
+        store.save_calendar(ticker, earnings)
+
+        days = pd.bdate_range(reports[-1] - pd.Timedelta(days=15), today)
+        returns = rng.normal(0, 0.015, len(days))
+        returns[days.searchsorted(reports[1:].normalize(), side="right")] += rng.normal(0, 0.06, cycles)
+        closes = 50 * np.exp(np.cumsum(returns))
+        opens = closes * (1 + rng.normal(0, 0.005, len(days)))
+        bars = pd.DataFrame({"Open": opens, "High": np.maximum(opens, closes) * 1.01,
+                             "Low": np.minimum(opens, closes) * 0.99, "Close": closes,
+                             "Volume": rng.integers(1e5, 1e7, len(days))},
+                            index=days.rename("Date"))
+        store.save_prices(ticker, bars)
+    return [f"SYN{i:03d}" for i in range(tickers)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the analysis pipeline against recorded data.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record = commands.add_parser("record", help="save live provider responses as fixtures")
+    record.add_argument("directory")
+    record.add_argument("tickers", nargs="+")
+    record.add_argument("--lookback", type=int, default=8)
+
+    synth = commands.add_parser("synth", help="generate synthetic fixtures")
+    synth.add_argument("directory")
+    synth.add_argument("--tickers", type=int, default=50)
+    synth.add_argument("--seed", type=int, default=0)
+
+    run = commands.add_parser("run", help="run the benchmarks")
+    run.add_argument("directory")
+    run.add_argument("--lookback", type=int, default=8)
+    run.add_argument("--latency", type=float, default=0.0, help="simulated seconds per provider request")
+    run.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="runs per benchmark (the best is kept)")
+    run.add_argument("--baseline", help="baseline file (default: DIRECTORY/baseline.json)")
+    run.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    run.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                     help="allowed fractional slowdown before reporting a regression")
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        record_fixtures(args.directory, [t.upper() for t in args.tickers], args.lookback)
+        print(f"Recorded {len(FixtureStore(args.directory).tickers())} tickers in {args.directory}")
+        return 0
+    if args.command == "synth":
+        tickers = synthesize_fixtures(args.directory, args.tickers, seed=args.seed)
+        print(f"Wrote fixtures for {len(tickers)} tickers to {args.directory}")
+        return 0
+
+    metrics.configure(sink=None)  # per-ticker progress messages would swamp the report
+    results = run_suite(args.directory, lookback=args.lookback, latency=args.latency, repeat=args.repeat)
+    baseline_path = args.baseline or os.path.join(args.directory, "baseline.json")
+    rows = compare(results, load_baseline(baseline_path), args.tolerance)
+    print(format_comparison(rows))
+    if args.save_baseline:
+        save_baseline(baseline_path, results)
+        print(f"\nBaseline saved to {baseline_path}")
+        return 0
+    return 1 if any(row[-1] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+import pandas as pd
+from datetime import datetime, timedelta
+import metrics
+from throttle import ProviderError
+from database import save_earnings_calendar, get_earnings_calendar, get_calendar_fetch
+
+# Re-fetch a stored calendar at least this often, even with no report due
+CALENDAR_TTL_DAYS = 7
+
+# Provider columns kept in earnings_calendar, in table order
+CALENDAR_COLUMNS = ["EPS Estimate", "Reported EPS", "Surprise(%)"]
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Hit/miss counters for the stored earnings calendar
+calendar_stats = {"hits": 0, "misses": 0, "network_calls": 0}
+metrics.register_counters("calendar_cache", calendar_stats)
+
+
+def calendar_is_stale(fetch_info, now=None):
+    """
+    A stored calendar needs re-fetching when there is none, its TTL has run out,
+    or its next scheduled report has happened since it was fetched.
+    """
+    if fetch_info is None:
+        return True
+
+    now = now or datetime.now()
+    fetched_at, next_report_date = fetch_info
+    fetched_at = datetime.strptime(fetched_at, TIMESTAMP_FORMAT)
+
+    if now - fetched_at > timedelta(days=CALENDAR_TTL_DAYS):
+        return True
+    if next_report_date and datetime.strptime(next_report_date, TIMESTAMP_FORMAT) <= now:
+        return True
+    return False
+
+
+def _value(value):
+    """Float or None for a provider cell that may be NaN."""
+    return float(value) if pd.notna(value) else None
+
+
+def _frame_to_rows(earnings):
+    """Convert a provider calendar frame to earnings_calendar rows with naive timestamps."""
+    index = earnings.index.tz_localize(None) if earnings.index.tz else earnings.index
+    columns = [earnings[col] if col in earnings.columns else pd.Series(None, index=earnings.index)
+               for col in CALENDAR_COLUMNS]
+    return [
+        (date.strftime(TIMESTAMP_FORMAT), *(_value(col.iloc[i]) for col in columns))
+        for i, date in enumerate(index)
+    ]
+
+
+def _rows_to_frame(rows):
+    """Convert stored calendar rows back into a frame shaped like the provider's."""
+    frame = pd.DataFrame(rows, columns=["Earnings Date"] + CALENDAR_COLUMNS)
+    frame.index = pd.DatetimeIndex(pd.to_datetime(frame.pop("Earnings Date")), name="Earnings Date")
+    return frame.astype(float)
+
+
+def load_earnings_dates(ticker, fresh_only=True):
+    """
+    Read a ticker's stored earnings calendar without touching the network.
+    With fresh_only, a stale calendar counts as missing. Returns None if missing.
+    """
+    ticker = ticker.upper()
+    if fresh_only and calendar_is_stale(get_calendar_fetch(ticker)):
+        return None
+    rows = get_earnings_calendar(ticker)
+    return _rows_to_frame(rows) if rows else None
+
+
+def store_earnings_dates(ticker, earnings, fetched_at=None):
+    """
+    Save a freshly fetched provider calendar, noting its next scheduled report.
+    A missing calendar (None or empty, e.g. for ETFs) is saved as an empty one,
+    so the ticker isn't fetched again until the TTL runs out.
+    """
+    fetched_at = (fetched_at or datetime.now()).strftime(TIMESTAMP_FORMAT)
+    rows = [] if earnings is None or earnings.empty else _frame_to_rows(earnings)
+    upcoming = [row[0] for row in rows if row[0] > fetched_at]
+    save_earnings_calendar(ticker, rows, fetched_at, min(upcoming) if upcoming else None)
+
+
+def get_cached_earnings_dates(ticker, fetch, refresh=False):
+    """
+    Return a ticker's earnings calendar from the database, calling fetch(ticker)
+    only when the stored copy is stale or refresh is set. Returns None when the
+    provider has no calendar for the ticker. If the fetch fails
+    (including the provider throttling us), a stale stored copy is still
+    returned rather than nothing.
+    """
+    if not refresh and not calendar_is_stale(get_calendar_fetch(ticker)):
+        calendar_stats["hits"] += 1
+        return load_earnings_dates(ticker, fresh_only=False)
+
+    calendar_stats["misses"] += 1
+    calendar_stats["network_calls"] += 1
+    fetched_at = datetime.now()
+    try:
+        store_earnings_dates(ticker, fetch(ticker), fetched_at)
+    except ProviderError:
+        stale = load_earnings_dates(ticker, fresh_only=False)
+        if stale is None:
+            raise
+        return stale
+    return load_earnings_dates(ticker, fresh_only=False)
+
+
+def reset_calendar_stats():
+    """Zero the calendar hit/miss counters."""
+    for key in calendar_stats:
+        calendar_stats[key] = 0
@@ -0,0 +1,108 @@
+import numpy as np
+from matplotlib.patches import Rectangle
+from theme import BG_DARK, BG_MID, BG_LIGHT, ACCENT, GREEN, RED, TEXT, TEXT_DIM, WHITE
+
+BAR_WIDTH = 0.6
+
+# Fixed margins instead of tight_layout on every redraw; leaves room for rotated date labels
+CHART_MARGINS = dict(left=0.07, right=0.98, top=0.9, bottom=0.24)
+
+
+class MoveChart:
+    """
+    Post-earnings move bar chart that keeps its bar and label artists between
+    updates, changing heights, colors and text in place and redrawing with
+    draw_idle instead of clearing and rebuilding the axes each time.
+    """
+
+    def __init__(self, ax, canvas):
+        self.ax = ax
+        self.canvas = canvas
+        self.bars = []
+        self.labels = []
+
+        ax.figure.subplots_adjust(**CHART_MARGINS)
+        ax.set_facecolor(BG_LIGHT)
+        ax.axhline(y=0, color=TEXT_DIM, linewidth=0.8, zorder=2)
+        ax.set_ylabel("Move %", color=TEXT, fontsize=9)
+        ax.tick_params(colors=TEXT)
+        ax.yaxis.grid(True, color=BG_DARK, linewidth=0.5, zorder=1)
+        for spine in ax.spines.values():
+            spine.set_edgecolor(BG_MID)
+        self.clear()
+
+    def _grow(self, count):
+        # New artists are only created when a chart needs more bars than it has ever shown
+        while len(self.bars) < count:
+            x = len(self.bars)
+            bar = Rectangle((x - BAR_WIDTH / 2, 0), BAR_WIDTH, 0, zorder=3)
+            self.ax.add_patch(bar)
+            label = self.ax.text(x, 0, "", ha="center", fontsize=7, color=TEXT)
+            self.bars.append(bar)
+            self.labels.append(label)
+
+    def update(self, ticker, dates, moves):
+        """Show one bar per move, oldest first, reusing existing artists."""
+        count = len(moves)
+        self._grow(count)
+
+        for i, (bar, label) in enumerate(zip(self.bars, self.labels)):
+            visible = i < count
+            bar.set_visible(visible)
+            label.set_visible(visible)
+            if not visible:
+                continue
+            move = moves[i]
+            bar.set_height(move)
+            bar.set_color(GREEN if move >= 0 else RED)
+            label.set_position((i, move + (0.1 if move >= 0 else -0.3)))
+            label.set_verticalalignment("bottom" if move >= 0 else "top")
+            label.set_text(f"{move:+.1f}%")
+
+        self.ax.set_xticks(range(count))
+        self.ax.set_xticklabels(dates, rotation=35, ha="right", fontsize=8, color=TEXT)
+        self.ax.set_xlim(-0.5, max(count, 1) - 0.5)
+        if count:
+            low, high = min(0, min(moves)), max(0, max(moves))
+            pad = (high - low) * 0.12 or 1
+            self.ax.set_ylim(low - pad, high + pad)
+        self.ax.set_title(f"{ticker} — Post-Earnings Price Moves", color=TEXT, fontsize=11)
+        self.canvas.draw_idle()
+
+    def clear(self):
+        """Hide every bar and reset the title."""
+        for artist in self.bars + self.labels:
+            artist.set_visible(False)
+        self.ax.set_xticks([])
+        self.ax.set_ylim(-1, 1)
+        self.ax.set_title("Post-Earnings Price Moves", color=TEXT, fontsize=11)
+        self.canvas.draw_idle()
+
+
+def draw_move_distributions(ax, moves_by_ticker):
+    """
+    Draw side-by-side box plots of post-earnings moves, one per ticker, in the
+    order given. moves_by_ticker is a list of (ticker, moves) pairs.
+    """
+    ax.clear()
+    ax.set_facecolor(BG_LIGHT)
+    if not moves_by_ticker:
+        ax.set_title("No saved earnings history to compare", color=TEXT, fontsize=11)
+        return
+
+    tickers = [ticker for ticker, _ in moves_by_ticker]
+    data = [np.asarray(moves, dtype=float) for _, moves in moves_by_ticker]
+    ax.boxplot(data, widths=0.6, patch_artist=True, showfliers=True,
+               boxprops=dict(facecolor=ACCENT, edgecolor=TEXT, alpha=0.6),
+               medianprops=dict(color=WHITE),
+               whiskerprops=dict(color=TEXT_DIM), capprops=dict(color=TEXT_DIM),
+               flierprops=dict(marker=".", markerfacecolor=RED, markeredgecolor=RED, markersize=4))
+    ax.axhline(y=0, color=TEXT_DIM, linewidth=0.8, zorder=0)
+    ax.set_xticks(range(1, len(tickers) + 1))
+    ax.set_xticklabels(tickers, rotation=60 if len(tickers) > 15 else 0, fontsize=8, color=TEXT)
+    ax.set_ylabel("Move %", color=TEXT, fontsize=9)
+    ax.set_title("Post-Earnings Move Distributions", color=TEXT, fontsize=11)
+    ax.tick_params(colors=TEXT)
+    ax.yaxis.grid(True, color=BG_DARK, linewidth=0.5)
+    for spine in ax.spines.values():
+        spine.set_edgecolor(BG_MID)
@@ -1,143 +1,402 @@
-import yfinance as yf
 import pandas as pd
+import numpy as np
 from datetime import datetime, timedelta
-from database import save_earnings, get_earnings_history
+import metrics
+from throttle import ProviderError
+from providers import YahooProvider
+from database import init_db, save_earnings_batch, get_earnings_history
+from price_cache import get_cached_price_history
+from calendar_cache import get_cached_earnings_dates
+from summary_cache import get_cached_results, store_results
+from earnings_series import EarningsSeries
 
-def get_earnings_dates(ticker):
-    """Pull historical earnings dates for a ticker."""
-    stock = yf.Ticker(ticker)
+# Calendar days of price data pulled on each side of an earnings date
+PRICE_WINDOW_DAYS = 5
+
+# Calendar days after a report searched for its 3- and 5-day bars (covers weekends and holidays)
+HORIZON_WINDOW_DAYS = 10
+
+# Where calendars and prices are downloaded from (see providers.py)
+provider = YahooProvider()
+
+
+def set_provider(new_provider):
+    """Send every download through new_provider, e.g. a providers.ReplayProvider. Returns the old one."""
+    global provider
+    old, provider = provider, new_provider
+    return old
+
+
+def get_earnings_dates(ticker, refresh=False):
+    """
+    Historical and upcoming earnings dates for a ticker, served from the stored
+    calendar unless it is stale or refresh is set.
+    """
+    with metrics.stage("calendar_fetch"):
+        return get_cached_earnings_dates(ticker, _download_earnings_dates, refresh)
+
+
+def _download_earnings_dates(ticker):
+    """
+    Pull historical earnings dates for a ticker. Returns None when the provider
+    has none; raises ProviderError when it is throttling us.
+    """
+    metrics.count("network.calendar")
     
     try:
-        earnings = stock.earnings_dates
+        earnings = provider.earnings_dates(ticker)
         if earnings is None or earnings.empty:
-            print(f"No earnings data found for {ticker}")
+            metrics.emit("no_earnings", f"No earnings data found for {ticker}", ticker=ticker)
             return None
         return earnings
+    except ProviderError:
+        raise
     except Exception as e:
-        print(f"Error fetching earnings dates for {ticker}: {e}")
+        metrics.emit("calendar_error", f"Error fetching earnings dates for {ticker}: {e}",
+                     ticker=ticker, error=str(e))
         return None
 
 
+def _download_price_history(ticker, start, end):
+    """
+    Pull daily price bars for a ticker between start (inclusive) and end (exclusive).
+    Returns a frame with a tz-naive index, or an empty frame if nothing came back.
+    """
+    metrics.count("network.price")
+    hist = provider.price_history(ticker, start, end)
+
+    if hist.empty:
+        return hist
+
+    hist.index = hist.index.tz_localize(None) if hist.index.tz else hist.index
+    return hist
+
+
+def download_price_histories(tickers, start, end):
+    """
+    Pull daily price bars for many tickers in one bulk request.
+    Returns {ticker: frame}; tickers the provider returned nothing for are left out.
+    """
+    metrics.count("network.bulk_price")
+    data = provider.price_histories(tickers, start, end)
+
+    if data is None or data.empty:
+        return {}
+
+    data.index = data.index.tz_localize(None) if data.index.tz else data.index
+    histories = {}
+    for ticker in tickers:
+        if ticker not in data.columns.get_level_values(0):
+            continue
+        hist = data[ticker].dropna(how="all")
+        if not hist.empty:
+            histories[ticker] = hist
+    return histories
+
+
+def get_price_history(ticker, start, end):
+    """Daily price bars for start <= date < end, served from the local cache where possible."""
+    with metrics.stage("price_fetch"):
+        return get_cached_price_history(ticker, start, end, _download_price_history)
+
+
+def get_past_earnings(earnings, lookback):
+    """Filter an earnings calendar to the last `lookback` reports that already happened."""
+    now = pd.Timestamp.now().tz_localize(None)
+    
+    if earnings.index.tz:
+        earnings.index = earnings.index.tz_localize(None)
+    
+    return earnings[earnings.index < now].head(lookback)
+
+
+def price_window(earnings_dates):
+    """Date range (start, end) covering the price window around every earnings date."""
+    start = (min(earnings_dates) - timedelta(days=PRICE_WINDOW_DAYS)).strftime("%Y-%m-%d")
+    end = (max(earnings_dates) + timedelta(days=HORIZON_WINDOW_DAYS)).strftime("%Y-%m-%d")
+    return start, end
+
+
+def calculate_move_horizons(hist, earnings_dates):
+    """
+    Calculate every post-earnings horizon for many earnings dates against one price
+    frame, all measured from the last close before the report:
+      move_pct            first close after the report (the headline move)
+      gap_pct             first open after the report
+      move_3d_pct         third close after the report
+      move_5d_pct         fifth close after the report
+      high/low_excursion_pct  intraday high and low of the first session after
+    Returns a dict per earnings date (or None when the headline move can't be
+    found), aligned with earnings_dates. Longer horizons are None until their bar exists.
+    """
+    if hist.empty or not earnings_dates:
+        return [None] * len(earnings_dates)
+
+    hist = hist.sort_index()
+    bar_dates = hist.index.values.astype("datetime64[ns]")
+    last_bar = len(bar_dates) - 1
+    closes = hist["Close"].to_numpy(dtype=float)
+
+    dates = pd.DatetimeIndex([pd.Timestamp(d) for d in earnings_dates])
+    days = dates.normalize()
+    window_start = (days - pd.Timedelta(days=PRICE_WINDOW_DAYS)).values
+    window_end = (days + pd.Timedelta(days=PRICE_WINDOW_DAYS)).values
+    horizon_end = (days + pd.Timedelta(days=HORIZON_WINDOW_DAYS)).values
+
+    # First bar strictly after each earnings timestamp; the bar before it is the last one on/before
+    after_idx = np.searchsorted(bar_dates, dates.values, side="right")
+    before_idx = after_idx - 1
+
+    valid = (before_idx >= 0) & (after_idx <= last_bar)
+    before_safe = np.clip(before_idx, 0, last_bar)
+    after_safe = np.clip(after_idx, 0, last_bar)
+    valid &= bar_dates[before_safe] >= window_start
+    valid &= bar_dates[after_safe] < window_end
+
+    price_before = closes[before_safe]
+
+    def bars(column):
+        # Frames holding only closes still give the headline move
+        if column not in hist:
+            return np.full(len(bar_dates), np.nan)
+        return hist[column].to_numpy(dtype=float)
+
+    def pct(prices, found=valid):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            values = np.round(((prices - price_before) / price_before) * 100, 2)
+        return np.where(found, values, np.nan)
+
+    def close_after(sessions):
+        idx = after_idx + sessions - 1
+        idx_safe = np.clip(idx, 0, last_bar)
+        found = valid & (idx <= last_bar) & (bar_dates[idx_safe] < horizon_end)
+        return pct(closes[idx_safe], found)
+
+    horizons = {
+        "move_pct": pct(closes[after_safe]),
+        "gap_pct": pct(bars("Open")[after_safe]),
+        "move_3d_pct": close_after(3),
+        "move_5d_pct": close_after(5),
+        "high_excursion_pct": pct(bars("High")[after_safe]),
+        "low_excursion_pct": pct(bars("Low")[after_safe]),
+    }
+
+    return [
+        {name: (values[i] if not np.isnan(values[i]) else None) for name, values in horizons.items()}
+        if valid[i] else None
+        for i in range(len(earnings_dates))
+    ]
+
+
+def calculate_post_earnings_moves(hist, earnings_dates):
+    """
+    Calculate the post-earnings move for many earnings dates against one price frame.
+    Compares closing price day before earnings to closing price day after, only
+    using bars inside the same ±PRICE_WINDOW_DAYS window the per-date fetch would see.
+    Returns a list of moves (or None) aligned with earnings_dates.
+    """
+    return [horizons["move_pct"] if horizons else None
+            for horizons in calculate_move_horizons(hist, earnings_dates)]
+
+
 def calculate_post_earnings_move(ticker, earnings_date):
     """
     Calculate the actual price move after earnings.
     Compares closing price day before earnings to closing price day after.
     """
-    stock = yf.Ticker(ticker)
-    
     # Get a window of price data around earnings
-    start = (earnings_date - timedelta(days=5)).strftime("%Y-%m-%d")
-    end = (earnings_date + timedelta(days=5)).strftime("%Y-%m-%d")
-    
-    hist = stock.history(start=start, end=end)
-    
+    start, end = price_window([earnings_date])
+    hist = get_price_history(ticker, start, end)
+
     if hist.empty or len(hist) < 2:
         return None
-    
-    hist.index = hist.index.tz_localize(None) if hist.index.tz else hist.index
-    earnings_date_naive = pd.Timestamp(earnings_date)
-    
-    # Find the closest trading days before and after earnings
-    before = hist[hist.index <= earnings_date_naive]
-    after = hist[hist.index > earnings_date_naive]
-    
-    if before.empty or after.empty:
-        return None
-    
-    price_before = before.iloc[-1]["Close"]
-    price_after = after.iloc[0]["Close"]
-    
-    move_pct = ((price_after - price_before) / price_before) * 100
-    return round(move_pct, 2)
+
+    return calculate_post_earnings_moves(hist, [earnings_date])[0]
+
+
+def _is_set(cancelled):
+    return cancelled is not None and cancelled.is_set()
 
 
-def analyze_ticker(ticker, lookback=8):
+def analyze_ticker(ticker, lookback=8, earnings=None, on_result=None, cancelled=None):
     """
     Full analysis of a ticker's earnings history.
     Pulls last `lookback` earnings, calculates moves, saves to database.
+    Pass `earnings` to reuse an already-fetched earnings calendar.
+    Pass `on_result` to receive each result dict as soon as its move is known.
+    Pass a threading.Event as `cancelled` to stop fetching once it is set;
+    a cancelled analysis returns None.
     """
-    print(f"\nAnalyzing {ticker.upper()}...")
-    
-    stock = yf.Ticker(ticker)
-    earnings = get_earnings_dates(ticker)
+    metrics.emit("analyze", f"\nAnalyzing {ticker.upper()}...", ticker=ticker.upper(), lookback=lookback)
     
     if earnings is None:
+        earnings = get_earnings_dates(ticker)
+    
+    if earnings is None or _is_set(cancelled):
         return None
 
-    # Filter to past earnings only
-    now = pd.Timestamp.now().tz_localize(None)
-    
-    if earnings.index.tz:
-        earnings.index = earnings.index.tz_localize(None)
-    
-    past_earnings = earnings[earnings.index < now].head(lookback)
+    past_earnings = get_past_earnings(earnings, lookback)
     
     if past_earnings.empty:
-        print(f"No past earnings found for {ticker}")
+        metrics.emit("no_past_earnings", f"No past earnings found for {ticker}", ticker=ticker)
         return None
 
+    cycle_dates = [date.strftime("%Y-%m-%d") for date in past_earnings.index]
+    results = get_cached_results(ticker, cycle_dates)
+
+    if results is None:
+        results = _calculate_results(ticker, past_earnings, on_result, cancelled)
+        if _is_set(cancelled):
+            # Moves found so far are saved, but a partial set isn't a summary
+            return None
+        if results:
+            store_results(ticker, cycle_dates, results)
+    else:
+        metrics.emit("cached_moves", f"  Using cached moves for {len(cycle_dates)} earnings",
+                     ticker=ticker, earnings=len(cycle_dates))
+        if on_result:
+            for result in results.rows():
+                on_result(result)
+
+    if not results:
+        metrics.emit("no_moves", f"Could not calculate moves for {ticker}", ticker=ticker)
+        return None
+
+    return summarize_results(ticker, results)
+
+
+def _price_batches(earnings_dates, streaming):
+    """
+    Split earnings dates into the groups fetched together. Everything goes in one
+    request, unless streaming, where the newest date gets its own small request
+    first so its result shows up after a single round trip.
+    """
+    if streaming and len(earnings_dates) > 1:
+        return [earnings_dates[:1], earnings_dates[1:]]
+    return [earnings_dates]
+
+
+def _iter_moves(ticker, earnings_dates, streaming=False, cancelled=None):
+    """
+    Yield (earnings_date, horizons) pairs, one price request per batch. See
+    calculate_move_horizons. Stops early once `cancelled` is set.
+    """
+    for batch in _price_batches(earnings_dates, streaming):
+        if _is_set(cancelled):
+            return
+        # One price request covering every earnings window, then all moves in one pass
+        start, end = price_window(batch)
+        hist = get_price_history(ticker, start, end)
+        if _is_set(cancelled):
+            return
+        with metrics.stage("move_calc"):
+            horizons = calculate_move_horizons(hist, batch)
+        for move in zip(batch, horizons):
+            if _is_set(cancelled):
+                return
+            yield move
+
+
+def _calculate_results(ticker, past_earnings, on_result=None, cancelled=None):
+    """
+    Calculate the post-earnings move for every row of past_earnings and save
+    them to the database. Returns an EarningsSeries of the moves that could be
+    found, handing each result dict to on_result as it is calculated.
+    """
+    earnings_dates = [date.to_pydatetime().replace(tzinfo=None) for date in past_earnings.index]
+    moves = _iter_moves(ticker, earnings_dates, streaming=on_result is not None, cancelled=cancelled)
+    results, records = build_results(past_earnings, moves, on_result)
+    results = EarningsSeries.from_results(ticker, results)
+
+    if records:
+        # Save to database, all rows for the ticker in one transaction
+        with metrics.stage("db_write"):
+            save_earnings_batch(ticker, records)
+
+    return results
+
+
+def build_results(past_earnings, moves, on_result=None):
+    """
+    Pair each past earnings row with its (earnings_date, horizons), skipping missing moves.
+    Returns (results, records): result dicts for the summary and
+    save_earnings_batch records for the database.
+    """
     results = []
+    records = []
     
-    for date, row in past_earnings.iterrows():
-        earnings_date = date.to_pydatetime().replace(tzinfo=None)
-        
+    for (earnings_date, horizons), (_, row) in zip(moves, past_earnings.iterrows()):
         # Get EPS data if available
         eps_estimate = row.get("EPS Estimate", None)
         eps_actual = row.get("Reported EPS", None)
         
-        # Calculate price move
-        move = calculate_post_earnings_move(ticker, earnings_date)
-        
-        if move is not None:
-            # Save to database
-            save_earnings(
-                ticker=ticker,
-                earnings_date=earnings_date.strftime("%Y-%m-%d"),
-                actual_move_pct=move,
-                eps_estimate=float(eps_estimate) if pd.notna(eps_estimate) else None,
-                eps_actual=float(eps_actual) if pd.notna(eps_actual) else None
-            )
+        if horizons is not None:
+            move = horizons["move_pct"]
+            extra = {name: value for name, value in horizons.items() if name != "move_pct"}
+            records.append({
+                "earnings_date": earnings_date.strftime("%Y-%m-%d"),
+                "actual_move_pct": move,
+                "eps_estimate": float(eps_estimate) if pd.notna(eps_estimate) else None,
+                "eps_actual": float(eps_actual) if pd.notna(eps_actual) else None,
+                **extra
+            })
             
             results.append({
                 "date": earnings_date.strftime("%Y-%m-%d"),
                 "move_pct": move,
                 "eps_estimate": eps_estimate,
-                "eps_actual": eps_actual
+                "eps_actual": eps_actual,
+                **extra
             })
+            if on_result:
+                on_result(results[-1])
             
-            print(f"  {earnings_date.strftime('%Y-%m-%d')}: {move:+.2f}%")
+            metrics.emit("move", f"  {earnings_date.strftime('%Y-%m-%d')}: {move:+.2f}%",
+                         date=earnings_date.strftime("%Y-%m-%d"), move_pct=move)
 
-    if not results:
-        print(f"Could not calculate moves for {ticker}")
-        return None
+    return results, records
+
+
+def summarize_results(ticker, results):
+    """
+    Build the summary dict for a ticker's per-earnings results (an EarningsSeries,
+    or result dicts, which are converted to one).
+    """
+    if not isinstance(results, EarningsSeries):
+        results = EarningsSeries.from_results(ticker, results)
 
     # Summary statistics
-    moves = [r["move_pct"] for r in results]
+    moves = results.moves
+    abs_moves = np.abs(moves)
     summary = {
         "ticker": ticker.upper(),
         "earnings_analyzed": len(moves),
-        "avg_move": round(sum(moves) / len(moves), 2),
-        "avg_abs_move": round(sum(abs(m) for m in moves) / len(moves), 2),
-        "max_move": round(max(moves, key=abs), 2),
-        "min_move": round(min(moves, key=abs), 2),
-        "positive_reactions": sum(1 for m in moves if m > 0),
-        "negative_reactions": sum(1 for m in moves if m < 0),
+        "avg_move": round(float(moves.mean()), 2),
+        "avg_abs_move": round(float(abs_moves.mean()), 2),
+        "max_move": round(float(moves[abs_moves.argmax()]), 2),
+        "min_move": round(float(moves[abs_moves.argmin()]), 2),
+        "positive_reactions": int((moves > 0).sum()),
+        "negative_reactions": int((moves < 0).sum()),
         "results": results
     }
 
-    print(f"\n  Summary for {ticker.upper()}:")
-    print(f"  Earnings analyzed: {summary['earnings_analyzed']}")
-    print(f"  Average move: {summary['avg_move']:+.2f}%")
-    print(f"  Average absolute move: {summary['avg_abs_move']:.2f}%")
-    print(f"  Largest move: {summary['max_move']:+.2f}%")
-    print(f"  Smallest move: {summary['min_move']:+.2f}%")
-    print(f"  Positive reactions: {summary['positive_reactions']}")
-    print(f"  Negative reactions: {summary['negative_reactions']}")
+    metrics.emit("summary",
+                 f"\n  Summary for {ticker.upper()}:\n"
+                 f"  Earnings analyzed: {summary['earnings_analyzed']}\n"
+                 f"  Average move: {summary['avg_move']:+.2f}%\n"
+                 f"  Average absolute move: {summary['avg_abs_move']:.2f}%\n"
+                 f"  Largest move: {summary['max_move']:+.2f}%\n"
+                 f"  Smallest move: {summary['min_move']:+.2f}%\n"
+                 f"  Positive reactions: {summary['positive_reactions']}\n"
+                 f"  Negative reactions: {summary['negative_reactions']}",
+                 **{key: value for key, value in summary.items() if key != "results"})
 
     return summary
 
 
 if __name__ == "__main__":
+    init_db()
+
     # Test with a couple of tickers
     analyze_ticker("AAPL")
     analyze_ticker("NVDA")
\ No newline at end of file
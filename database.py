@@ -1,11 +1,56 @@
 import sqlite3
+import threading
 import os
+import metrics
 
 DB_PATH = "trading_data.db"
 
+# Applied to every connection when it is opened
+PRAGMAS = [
+    "PRAGMA journal_mode=WAL",       # readers don't block the writer
+    "PRAGMA synchronous=NORMAL",     # fsync at checkpoints, not every commit
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",      # 64 MB page cache
+    "PRAGMA mmap_size=268435456",    # 256 MB memory-mapped reads
+    "PRAGMA busy_timeout=30000",     # wait for the writer lock instead of failing
+    "PRAGMA recursive_triggers=ON",  # INSERT OR REPLACE fires delete triggers too
+]
+
+# earnings_history columns for the moves measured beyond the first close after a report
+HORIZON_COLUMNS = ["gap_pct", "move_3d_pct", "move_5d_pct", "high_excursion_pct", "low_excursion_pct"]
+
+_local = threading.local()
+
+
+def get_connection():
+    """
+    Return this thread's connection to DB_PATH, opening it on first use.
+    Connections stay open for the life of the thread, one per thread,
+    so GUI worker threads can use the database safely.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is None or _local.path != DB_PATH:
+        if conn is not None:
+            conn.close()
+        conn = sqlite3.connect(DB_PATH, timeout=30)
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        _local.conn = conn
+        _local.path = DB_PATH
+    return conn
+
+
+def close_connection():
+    """Close this thread's connection, if it has one."""
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        conn.close()
+        _local.conn = None
+
+
 def init_db():
     """Initialize the database and create tables if they don't exist."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection()
     c = conn.cursor()
 
     # Earnings history table
@@ -22,10 +67,21 @@ def init_db():
             beat_eps INTEGER,
             notes TEXT,
             date_logged TEXT DEFAULT CURRENT_TIMESTAMP,
+            gap_pct REAL,
+            move_3d_pct REAL,
+            move_5d_pct REAL,
+            high_excursion_pct REAL,
+            low_excursion_pct REAL,
             UNIQUE(ticker, earnings_date)
         )
     ''')
 
+    # Databases created before the multi-horizon moves existed get the new columns
+    existing = {row[1] for row in c.execute('PRAGMA table_info(earnings_history)')}
+    for column in HORIZON_COLUMNS:
+        if column not in existing:
+            c.execute(f'ALTER TABLE earnings_history ADD COLUMN {column} REAL')
+
     # Ticker watchlist table
     c.execute('''
         CREATE TABLE IF NOT EXISTS watchlist (
@@ -36,88 +92,750 @@ def init_db():
         )
     ''')
 
+    # Daily price bars cached from the data provider
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS price_history (
+            ticker TEXT NOT NULL,
+            date TEXT NOT NULL,
+            open REAL,
+            high REAL,
+            low REAL,
+            close REAL,
+            volume REAL,
+            PRIMARY KEY (ticker, date)
+        )
+    ''')
+
+    # Date ranges already fetched per ticker, so holidays and weekends
+    # inside a fetched range aren't mistaken for gaps
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS price_coverage (
+            ticker TEXT NOT NULL,
+            start_date TEXT NOT NULL,
+            end_date TEXT NOT NULL,
+            PRIMARY KEY (ticker, start_date)
+        )
+    ''')
+
+    # Earnings calendar as last fetched from the data provider
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS earnings_calendar (
+            ticker TEXT NOT NULL,
+            earnings_date TEXT NOT NULL,
+            eps_estimate REAL,
+            eps_actual REAL,
+            surprise_pct REAL,
+            PRIMARY KEY (ticker, earnings_date)
+        )
+    ''')
+
+    # When each ticker's calendar was fetched and its next scheduled report
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS calendar_fetches (
+            ticker TEXT PRIMARY KEY,
+            fetched_at TEXT NOT NULL,
+            next_report_date TEXT
+        )
+    ''')
+
+    # ATM straddle summary per ticker, earnings date and snapshot day (not whole chains)
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS option_snapshots (
+            ticker TEXT NOT NULL,
+            earnings_date TEXT NOT NULL,
+            snapshot_date TEXT NOT NULL,
+            expiration TEXT NOT NULL,
+            spot REAL,
+            atm_strike REAL,
+            straddle REAL,
+            implied_move_pct REAL,
+            PRIMARY KEY (ticker, earnings_date, snapshot_date)
+        )
+    ''')
+
+    # Small key/value settings remembered between runs (e.g. last-viewed ticker)
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS app_state (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+    ''')
+
+    # Batch refresh runs and the tickers each one has finished, so runs can resume
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS refresh_runs (
+            run_id TEXT PRIMARY KEY,
+            started_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            finished_at TEXT
+        )
+    ''')
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS refresh_progress (
+            run_id TEXT NOT NULL,
+            ticker TEXT NOT NULL,
+            status TEXT NOT NULL,
+            ranking TEXT,
+            PRIMARY KEY (run_id, ticker)
+        )
+    ''')
+
+    # One job per reported earnings date waiting to be analyzed by scheduler.py
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS report_jobs (
+            ticker TEXT NOT NULL,
+            earnings_date TEXT NOT NULL,
+            due_at TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            last_error TEXT,
+            PRIMARY KEY (ticker, earnings_date)
+        )
+    ''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_report_jobs_due ON report_jobs (due_at) WHERE status = 'pending'")
+
+    # Per-ticker running totals, kept current by triggers on earnings_history
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS ticker_stats (
+            ticker TEXT PRIMARY KEY,
+            cycles INTEGER NOT NULL DEFAULT 0,
+            sum_move REAL NOT NULL DEFAULT 0,
+            sum_abs_move REAL NOT NULL DEFAULT 0,
+            sum_sq_move REAL NOT NULL DEFAULT 0,
+            positive_reactions INTEGER NOT NULL DEFAULT 0,
+            negative_reactions INTEGER NOT NULL DEFAULT 0,
+            expected_count INTEGER NOT NULL DEFAULT 0,
+            within_expected_count INTEGER NOT NULL DEFAULT 0,
+            avg_move REAL GENERATED ALWAYS AS (sum_move / cycles),
+            avg_abs_move REAL GENERATED ALWAYS AS (sum_abs_move / cycles),
+            move_variance REAL GENERATED ALWAYS AS (CASE WHEN cycles > 1
+                THEN max((sum_sq_move - sum_move * sum_move / cycles) / (cycles - 1), 0) END)
+        )
+    ''')
+
+    c.execute('CREATE INDEX IF NOT EXISTS idx_ticker_stats_abs_move ON ticker_stats (avg_abs_move, cycles)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_ticker_stats_variance ON ticker_stats (move_variance)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_earnings_history_date ON earnings_history (earnings_date)')
+
+    for trigger in _ticker_stats_triggers():
+        c.execute(trigger)
+
+    # Older databases have history from before ticker_stats existed
+    has_stats = c.execute('SELECT 1 FROM ticker_stats LIMIT 1').fetchone()
+    has_history = c.execute('SELECT 1 FROM earnings_history LIMIT 1').fetchone()
     conn.commit()
-    conn.close()
-    print(f"Database initialized at {DB_PATH}")
+    if has_history and not has_stats:
+        rebuild_ticker_stats()
 
+    metrics.emit("db_init", f"Database initialized at {DB_PATH}", path=DB_PATH)
 
-def save_earnings(ticker, earnings_date, actual_move_pct, 
-                  expected_move_pct=None, eps_estimate=None, 
-                  eps_actual=None, notes=None):
-    """Save or update an earnings record."""
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
 
+def _ticker_stats_delta(row, sign):
+    """
+    SQL applying one earnings_history row (NEW or OLD) to ticker_stats.
+    sign is "+" to add the row's move, "-" to take it back out.
+    """
+    move = f"{row}.actual_move_pct"
+    within = f"COALESCE(abs({move}) <= abs({row}.expected_move_pct), 0)"
+    if sign == "+":
+        return f'''
+            INSERT INTO ticker_stats
+            (ticker, cycles, sum_move, sum_abs_move, sum_sq_move, positive_reactions,
+             negative_reactions, expected_count, within_expected_count)
+            SELECT {row}.ticker, 1, {move}, abs({move}), {move} * {move}, {move} > 0,
+                   {move} < 0, {row}.expected_move_pct IS NOT NULL, {within}
+            WHERE {move} IS NOT NULL
+            ON CONFLICT(ticker) DO UPDATE SET
+                cycles = cycles + 1,
+                sum_move = sum_move + excluded.sum_move,
+                sum_abs_move = sum_abs_move + excluded.sum_abs_move,
+                sum_sq_move = sum_sq_move + excluded.sum_sq_move,
+                positive_reactions = positive_reactions + excluded.positive_reactions,
+                negative_reactions = negative_reactions + excluded.negative_reactions,
+                expected_count = expected_count + excluded.expected_count,
+                within_expected_count = within_expected_count + excluded.within_expected_count;
+        '''
+    return f'''
+        UPDATE ticker_stats SET
+            cycles = cycles - 1,
+            sum_move = sum_move - {move},
+            sum_abs_move = sum_abs_move - abs({move}),
+            sum_sq_move = sum_sq_move - {move} * {move},
+            positive_reactions = positive_reactions - ({move} > 0),
+            negative_reactions = negative_reactions - ({move} < 0),
+            expected_count = expected_count - ({row}.expected_move_pct IS NOT NULL),
+            within_expected_count = within_expected_count - {within}
+        WHERE ticker = {row}.ticker AND {move} IS NOT NULL;
+        DELETE FROM ticker_stats WHERE ticker = {row}.ticker AND cycles <= 0;
+    '''
+
+
+def _ticker_stats_triggers():
+    """Triggers keeping ticker_stats in step with every earnings_history write."""
+    return [
+        f'''CREATE TRIGGER IF NOT EXISTS ticker_stats_insert
+            AFTER INSERT ON earnings_history BEGIN {_ticker_stats_delta("NEW", "+")} END''',
+        f'''CREATE TRIGGER IF NOT EXISTS ticker_stats_delete
+            AFTER DELETE ON earnings_history BEGIN {_ticker_stats_delta("OLD", "-")} END''',
+        f'''CREATE TRIGGER IF NOT EXISTS ticker_stats_update
+            AFTER UPDATE OF ticker, actual_move_pct, expected_move_pct ON earnings_history
+            BEGIN {_ticker_stats_delta("OLD", "-")} {_ticker_stats_delta("NEW", "+")} END''',
+    ]
+
+
+def rebuild_ticker_stats():
+    """Recompute ticker_stats from scratch out of earnings_history."""
+    conn = get_connection()
+    with conn:
+        conn.execute('DELETE FROM ticker_stats')
+        conn.execute('''
+            INSERT INTO ticker_stats
+            (ticker, cycles, sum_move, sum_abs_move, sum_sq_move, positive_reactions,
+             negative_reactions, expected_count, within_expected_count)
+            SELECT ticker, count(*), sum(actual_move_pct), sum(abs(actual_move_pct)),
+                   sum(actual_move_pct * actual_move_pct), sum(actual_move_pct > 0),
+                   sum(actual_move_pct < 0), count(expected_move_pct),
+                   total(abs(actual_move_pct) <= abs(expected_move_pct))
+            FROM earnings_history
+            WHERE actual_move_pct IS NOT NULL
+            GROUP BY ticker
+        ''')
+
+
+# beat_expected is 1 when the actual move stayed inside the expected move
+BEAT_EXPECTED_SQL = '''
+    CASE WHEN {expected} IS NULL OR {actual} IS NULL THEN NULL
+         ELSE abs({actual}) <= abs({expected}) END
+'''
+
+# beat_eps is 1 when the reported EPS met or beat the estimate
+BEAT_EPS_SQL = '''
+    CASE WHEN {estimate} IS NULL OR {actual} IS NULL THEN NULL
+         ELSE {actual} >= {estimate} END
+'''
+
+# An expected move, note or horizon move already on file is kept when the new row
+# has none, so re-analyzing a ticker never wipes a backfilled expected_move_pct
+EARNINGS_UPSERT_SQL = '''
+    INSERT INTO earnings_history 
+    (ticker, earnings_date, expected_move_pct, actual_move_pct, 
+     beat_expected, eps_estimate, eps_actual, beat_eps, notes,
+     gap_pct, move_3d_pct, move_5d_pct, high_excursion_pct, low_excursion_pct)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(ticker, earnings_date) DO UPDATE SET
+        expected_move_pct = COALESCE(excluded.expected_move_pct, expected_move_pct),
+        actual_move_pct = excluded.actual_move_pct,
+        beat_expected = ''' + BEAT_EXPECTED_SQL.format(
+            expected="COALESCE(excluded.expected_move_pct, expected_move_pct)",
+            actual="excluded.actual_move_pct") + ''',
+        eps_estimate = excluded.eps_estimate,
+        eps_actual = excluded.eps_actual,
+        beat_eps = excluded.beat_eps,
+        notes = COALESCE(excluded.notes, notes),
+''' + ",\n".join(f"        {col} = COALESCE(excluded.{col}, {col})" for col in HORIZON_COLUMNS) + "\n"
+
+
+# Sets the expected move for an earnings date, creating the row if the report is still upcoming
+EXPECTED_MOVE_UPSERT_SQL = '''
+    INSERT INTO earnings_history (ticker, earnings_date, expected_move_pct)
+    VALUES (?, ?, ?)
+    ON CONFLICT(ticker, earnings_date) DO UPDATE SET
+        expected_move_pct = excluded.expected_move_pct,
+        beat_expected = ''' + BEAT_EXPECTED_SQL.format(
+            expected="excluded.expected_move_pct", actual="actual_move_pct") + '''
+'''
+
+
+def _earnings_row(ticker, earnings_date, actual_move_pct,
+                  expected_move_pct=None, eps_estimate=None,
+                  eps_actual=None, notes=None, **horizons):
+    """Build the earnings_history row for EARNINGS_UPSERT_SQL."""
     beat_expected = None
-    if expected_move_pct and actual_move_pct:
+    if expected_move_pct is not None and actual_move_pct is not None:
         beat_expected = 1 if abs(actual_move_pct) <= abs(expected_move_pct) else 0
 
     beat_eps = None
-    if eps_estimate and eps_actual:
+    if eps_estimate is not None and eps_actual is not None:
         beat_eps = 1 if eps_actual >= eps_estimate else 0
 
-    c.execute('''
-        INSERT OR REPLACE INTO earnings_history 
-        (ticker, earnings_date, expected_move_pct, actual_move_pct, 
-         beat_expected, eps_estimate, eps_actual, beat_eps, notes)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (ticker.upper(), earnings_date, expected_move_pct, actual_move_pct,
-          beat_expected, eps_estimate, eps_actual, beat_eps, notes))
+    return (ticker.upper(), earnings_date, expected_move_pct, actual_move_pct,
+            beat_expected, eps_estimate, eps_actual, beat_eps, notes,
+            *(horizons.get(column) for column in HORIZON_COLUMNS))
 
-    conn.commit()
-    conn.close()
+
+def save_earnings(ticker, earnings_date, actual_move_pct, 
+                  expected_move_pct=None, eps_estimate=None, 
+                  eps_actual=None, notes=None):
+    """Save or update an earnings record."""
+    conn = get_connection()
+    with conn:
+        conn.execute(EARNINGS_UPSERT_SQL, _earnings_row(
+            ticker, earnings_date, actual_move_pct, expected_move_pct,
+            eps_estimate, eps_actual, notes))
+
+
+def save_earnings_batch(ticker, records):
+    """
+    Save or update many earnings records for a ticker in one transaction.
+    records are dicts with save_earnings' keyword arguments (minus ticker),
+    optionally with HORIZON_COLUMNS keys as well.
+    """
+    rows = [_earnings_row(ticker, **record) for record in records]
+    conn = get_connection()
+    with conn:
+        conn.executemany(EARNINGS_UPSERT_SQL, rows)
+
+
+def save_expected_moves(rows):
+    """
+    Save expected moves in one transaction. rows are
+    (ticker, earnings_date, expected_move_pct) tuples.
+    """
+    conn = get_connection()
+    with conn:
+        conn.executemany(EXPECTED_MOVE_UPSERT_SQL,
+                         [(ticker.upper(), date, move) for ticker, date, move in rows])
+
+
+def save_option_snapshots(rows):
+    """
+    Save option snapshots and copy each implied move into expected_move_pct,
+    in one transaction. rows are (ticker, earnings_date, snapshot_date,
+    expiration, spot, atm_strike, straddle, implied_move_pct) tuples.
+    """
+    rows = [(row[0].upper(), *row[1:]) for row in rows]
+    conn = get_connection()
+    with conn:
+        conn.executemany('''
+            INSERT OR REPLACE INTO option_snapshots
+            (ticker, earnings_date, snapshot_date, expiration, spot, atm_strike,
+             straddle, implied_move_pct)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+        conn.executemany(EXPECTED_MOVE_UPSERT_SQL, [(row[0], row[1], row[7]) for row in rows])
+
+
+def get_option_snapshots(ticker):
+    """Retrieve a ticker's option snapshots, newest first."""
+    conn = get_connection()
+    c = conn.cursor()
+    c.execute('''
+        SELECT earnings_date, snapshot_date, expiration, spot, atm_strike,
+               straddle, implied_move_pct
+        FROM option_snapshots
+        WHERE ticker = ?
+        ORDER BY snapshot_date DESC
+    ''', (ticker.upper(),))
+    return c.fetchall()
 
 
 def get_earnings_history(ticker):
     """Retrieve all earnings records for a ticker."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection()
     c = conn.cursor()
 
     c.execute('''
         SELECT ticker, earnings_date, expected_move_pct, actual_move_pct,
-               beat_expected, eps_estimate, eps_actual, beat_eps, notes
+               beat_expected, eps_estimate, eps_actual, beat_eps, notes,
+               gap_pct, move_3d_pct, move_5d_pct, high_excursion_pct, low_excursion_pct
         FROM earnings_history
         WHERE ticker = ?
         ORDER BY earnings_date DESC
     ''', (ticker.upper(),))
 
     rows = c.fetchall()
-    conn.close()
     return rows
 
 
 def get_watchlist():
     """Retrieve all tickers on the watchlist."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection()
     c = conn.cursor()
     c.execute('SELECT ticker, date_added, notes FROM watchlist ORDER BY ticker')
     rows = c.fetchall()
-    conn.close()
     return rows
 
 
+def _prefix_bounds(prefix):
+    """[low, high) range of the strings starting with prefix, so a prefix match can use an index."""
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def count_watchlist(prefix="", before=None):
+    """Number of watchlist tickers starting with prefix (and sorting before `before`, if given)."""
+    conn = get_connection()
+    where, params = [], []
+    if prefix:
+        where.append('ticker >= ? AND ticker < ?')
+        params.extend(_prefix_bounds(prefix.upper()))
+    if before:
+        where.append('ticker < ?')
+        params.append(before.upper())
+    sql = 'SELECT COUNT(*) FROM watchlist' + (' WHERE ' + ' AND '.join(where) if where else '')
+    return conn.execute(sql, params).fetchone()[0]
+
+
+def search_watchlist(prefix="", offset=0, limit=-1):
+    """
+    Watchlist tickers starting with prefix, in ticker order, skipping the first
+    offset matches (limit -1 means no limit). Range-scans the ticker index.
+    """
+    conn = get_connection()
+    if not prefix:
+        rows = conn.execute('SELECT ticker FROM watchlist ORDER BY ticker LIMIT ? OFFSET ?',
+                            (limit, offset))
+    else:
+        rows = conn.execute('''
+            SELECT ticker FROM watchlist WHERE ticker >= ? AND ticker < ?
+            ORDER BY ticker LIMIT ? OFFSET ?
+        ''', (*_prefix_bounds(prefix.upper()), limit, offset))
+    return [row[0] for row in rows]
+
+
 def add_to_watchlist(ticker, notes=None):
-    """Add a ticker to the watchlist."""
-    conn = sqlite3.connect(DB_PATH)
+    """Add a ticker to the watchlist. Returns False when it was already there."""
+    conn = get_connection()
     c = conn.cursor()
     try:
         c.execute('INSERT INTO watchlist (ticker, notes) VALUES (?, ?)',
                   (ticker.upper(), notes))
         conn.commit()
-        print(f"{ticker.upper()} added to watchlist.")
+        metrics.emit("watchlist_add", f"{ticker.upper()} added to watchlist.", ticker=ticker.upper())
+        return True
     except sqlite3.IntegrityError:
-        print(f"{ticker.upper()} is already on the watchlist.")
-    conn.close()
+        conn.rollback()
+        metrics.emit("watchlist_exists", f"{ticker.upper()} is already on the watchlist.",
+                     ticker=ticker.upper())
+        return False
 
 
 def remove_from_watchlist(ticker):
-    """Remove a ticker from the watchlist."""
-    conn = sqlite3.connect(DB_PATH)
+    """Remove a ticker from the watchlist. Returns False when it wasn't there."""
+    conn = get_connection()
     c = conn.cursor()
     c.execute('DELETE FROM watchlist WHERE ticker = ?', (ticker.upper(),))
     conn.commit()
-    conn.close()
-    print(f"{ticker.upper()} removed from watchlist.")
+    if not c.rowcount:
+        return False
+    metrics.emit("watchlist_remove", f"{ticker.upper()} removed from watchlist.", ticker=ticker.upper())
+    return True
+
+
+def save_price_history(ticker, rows):
+    """Save daily price bars. rows are (date, open, high, low, close, volume) tuples."""
+    conn = get_connection()
+    c = conn.cursor()
+    c.executemany('''
+        INSERT OR REPLACE INTO price_history
+        (ticker, date, open, high, low, close, volume)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', [(ticker.upper(), *row) for row in rows])
+    conn.commit()
+
+
+def get_price_history(ticker, start, end):
+    """Retrieve cached price bars for a ticker with start <= date < end."""
+    conn = get_connection()
+    c = conn.cursor()
+    c.execute('''
+        SELECT date, open, high, low, close, volume
+        FROM price_history
+        WHERE ticker = ? AND date >= ? AND date < ?
+        ORDER BY date
+    ''', (ticker.upper(), start, end))
+    rows = c.fetchall()
+    return rows
+
+
+def get_price_coverage(ticker):
+    """Retrieve the (start_date, end_date) ranges already fetched for a ticker."""
+    conn = get_connection()
+    c = conn.cursor()
+    c.execute('''
+        SELECT start_date, end_date FROM price_coverage
+        WHERE ticker = ? ORDER BY start_date
+    ''', (ticker.upper(),))
+    rows = c.fetchall()
+    return rows
+
+
+def set_price_coverage(ticker, ranges):
+    """Replace the fetched date ranges recorded for a ticker."""
+    conn = get_connection()
+    c = conn.cursor()
+    c.execute('DELETE FROM price_coverage WHERE ticker = ?', (ticker.upper(),))
+    c.executemany('''
+        INSERT INTO price_coverage (ticker, start_date, end_date) VALUES (?, ?, ?)
+    ''', [(ticker.upper(), start, end) for start, end in ranges])
+    conn.commit()
+
+
+def delete_price_history(ticker, start=None, end=None):
+    """Delete cached price bars for a ticker, optionally only start <= date < end."""
+    conn = get_connection()
+    c = conn.cursor()
+    c.execute('''
+        DELETE FROM price_history
+        WHERE ticker = ? AND date >= COALESCE(?, date) AND date < COALESCE(?, '9999-12-31')
+    ''', (ticker.upper(), start, end))
+    conn.commit()
+
+
+def save_earnings_calendar(ticker, rows, fetched_at, next_report_date=None):
+    """
+    Replace a ticker's stored earnings calendar.
+    rows are (earnings_date, eps_estimate, eps_actual, surprise_pct) tuples.
+    """
+    ticker = ticker.upper()
+    conn = get_connection()
+    with conn:
+        conn.execute('DELETE FROM earnings_calendar WHERE ticker = ?', (ticker,))
+        conn.executemany('''
+            INSERT INTO earnings_calendar
+            (ticker, earnings_date, eps_estimate, eps_actual, surprise_pct)
+            VALUES (?, ?, ?, ?, ?)
+        ''', [(ticker, *row) for row in rows])
+        conn.execute('''
+            INSERT OR REPLACE INTO calendar_fetches (ticker, fetched_at, next_report_date)
+            VALUES (?, ?, ?)
+        ''', (ticker, fetched_at, next_report_date))
+
+
+def get_earnings_calendar(ticker):
+    """Retrieve a ticker's stored earnings calendar, newest first."""
+    conn = get_connection()
+    c = conn.cursor()
+    c.execute('''
+        SELECT earnings_date, eps_estimate, eps_actual, surprise_pct
+        FROM earnings_calendar
+        WHERE ticker = ?
+        ORDER BY earnings_date DESC
+    ''', (ticker.upper(),))
+    rows = c.fetchall()
+    return rows
+
+
+def get_calendar_fetch(ticker):
+    """Retrieve (fetched_at, next_report_date) for a ticker's calendar, or None."""
+    conn = get_connection()
+    c = conn.cursor()
+    c.execute('''
+        SELECT fetched_at, next_report_date FROM calendar_fetches WHERE ticker = ?
+    ''', (ticker.upper(),))
+    return c.fetchone()
+
+
+def get_app_state(key):
+    """Retrieve a saved setting, or None if it was never set."""
+    conn = get_connection()
+    c = conn.cursor()
+    c.execute('SELECT value FROM app_state WHERE key = ?', (key,))
+    row = c.fetchone()
+    return row[0] if row else None
+
+
+def set_app_state(key, value):
+    """Save a setting."""
+    conn = get_connection()
+    with conn:
+        conn.execute('INSERT OR REPLACE INTO app_state (key, value) VALUES (?, ?)', (key, value))
+
+
+def start_refresh_run(run_id, restart=False):
+    """
+    Begin a refresh run, or pick up an unfinished one with the same id.
+    Returns True when resuming. Finished runs and restart=True start over.
+    """
+    conn = get_connection()
+    with conn:
+        row = conn.execute('SELECT finished_at FROM refresh_runs WHERE run_id = ?', (run_id,)).fetchone()
+        if row is not None and row[0] is None and not restart:
+            return True
+        conn.execute('DELETE FROM refresh_progress WHERE run_id = ?', (run_id,))
+        conn.execute('INSERT OR REPLACE INTO refresh_runs (run_id) VALUES (?)', (run_id,))
+    return False
+
+
+def mark_refresh_ticker(run_id, ticker, status, ranking=None):
+    """Record that a refresh run finished a ticker ("done" or "failed")."""
+    conn = get_connection()
+    with conn:
+        conn.execute('''
+            INSERT OR REPLACE INTO refresh_progress (run_id, ticker, status, ranking)
+            VALUES (?, ?, ?, ?)
+        ''', (run_id, ticker.upper(), status, ranking))
+
+
+def get_refresh_progress(run_id):
+    """Retrieve (ticker, status, ranking) rows for the tickers a run has finished."""
+    conn = get_connection()
+    c = conn.cursor()
+    c.execute('''
+        SELECT ticker, status, ranking FROM refresh_progress WHERE run_id = ? ORDER BY ticker
+    ''', (run_id,))
+    rows = c.fetchall()
+    return rows
+
+
+def finish_refresh_run(run_id):
+    """Mark a refresh run complete, so the next run with its id starts fresh."""
+    conn = get_connection()
+    with conn:
+        conn.execute('UPDATE refresh_runs SET finished_at = CURRENT_TIMESTAMP WHERE run_id = ?', (run_id,))
+
+
+def get_analyzed_dates(ticker):
+    """Earnings dates a ticker already has an actual move saved for."""
+    conn = get_connection()
+    c = conn.cursor()
+    c.execute('''
+        SELECT earnings_date FROM earnings_history
+        WHERE ticker = ? AND actual_move_pct IS NOT NULL
+    ''', (ticker.upper(),))
+    return {row[0] for row in c.fetchall()}
+
+
+def enqueue_report_jobs(rows):
+    """
+    Queue reports for analysis, ignoring any already queued (in any status).
+    rows are (ticker, earnings_date, due_at) tuples. Returns how many were new.
+    """
+    conn = get_connection()
+    with conn:
+        before = conn.total_changes
+        conn.executemany('''
+            INSERT OR IGNORE INTO report_jobs (ticker, earnings_date, due_at) VALUES (?, ?, ?)
+        ''', [(ticker.upper(), date, due_at) for ticker, date, due_at in rows])
+        return conn.total_changes - before
+
+
+def get_due_report_jobs(now):
+    """Retrieve (ticker, earnings_date, attempts) for pending jobs due by now, oldest first."""
+    conn = get_connection()
+    c = conn.cursor()
+    c.execute('''
+        SELECT ticker, earnings_date, attempts FROM report_jobs
+        WHERE status = 'pending' AND due_at <= ?
+        ORDER BY due_at, ticker
+    ''', (now,))
+    return c.fetchall()
+
+
+def update_report_jobs(rows):
+    """
+    Record job outcomes in one transaction. rows are
+    (ticker, earnings_date, status, due_at, last_error) tuples; each counts as an attempt.
+    """
+    conn = get_connection()
+    with conn:
+        conn.executemany('''
+            UPDATE report_jobs
+            SET status = ?, due_at = ?, last_error = ?, attempts = attempts + 1
+            WHERE ticker = ? AND earnings_date = ?
+        ''', [(status, due_at, error, ticker.upper(), date)
+              for ticker, date, status, due_at, error in rows])
+
+
+# Tables moved by dataset.py: exported columns, in the order BULK_UPSERT_SQL takes them
+BULK_COLUMNS = {
+    "watchlist": ["ticker", "date_added", "notes"],
+    "earnings_history": ["ticker", "earnings_date", "expected_move_pct", "actual_move_pct",
+                         "beat_expected", "eps_estimate", "eps_actual", "beat_eps", "notes",
+                         *HORIZON_COLUMNS],
+    "price_history": ["ticker", "date", "open", "high", "low", "close", "volume"],
+    "price_coverage": ["ticker", "start_date", "end_date"],
+}
+
+# An imported report only fills in what it has: every column the import leaves NULL
+# keeps its stored value, and the beat flags are worked out from the merged values
+EARNINGS_IMPORT_SQL = '''
+    INSERT INTO earnings_history
+    (ticker, earnings_date, expected_move_pct, actual_move_pct,
+     beat_expected, eps_estimate, eps_actual, beat_eps, notes,
+     gap_pct, move_3d_pct, move_5d_pct, high_excursion_pct, low_excursion_pct)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(ticker, earnings_date) DO UPDATE SET
+''' + ",\n".join(f"        {col} = COALESCE(excluded.{col}, {col})" for col in
+                  ["expected_move_pct", "actual_move_pct", "eps_estimate", "eps_actual", "notes",
+                   *HORIZON_COLUMNS]) + ''',
+        beat_expected = ''' + BEAT_EXPECTED_SQL.format(
+            expected="COALESCE(excluded.expected_move_pct, expected_move_pct)",
+            actual="COALESCE(excluded.actual_move_pct, actual_move_pct)") + ''',
+        beat_eps = ''' + BEAT_EPS_SQL.format(
+            estimate="COALESCE(excluded.eps_estimate, eps_estimate)",
+            actual="COALESCE(excluded.eps_actual, eps_actual)") + "\n"
+
+# How imported rows merge with rows already in the database
+BULK_UPSERT_SQL = {
+    "watchlist": '''
+        INSERT INTO watchlist (ticker, date_added, notes) VALUES (?, ?, ?)
+        ON CONFLICT(ticker) DO UPDATE SET notes = COALESCE(excluded.notes, notes)
+    ''',
+    "earnings_history": EARNINGS_IMPORT_SQL,
+    "price_history": '''
+        INSERT OR REPLACE INTO price_history
+        (ticker, date, open, high, low, close, volume)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''',
+    "price_coverage": '''
+        INSERT INTO price_coverage (ticker, start_date, end_date) VALUES (?, ?, ?)
+        ON CONFLICT(ticker, start_date) DO UPDATE SET end_date = max(end_date, excluded.end_date)
+    ''',
+}
+
+
+def count_table_rows(table):
+    """Number of rows in one of the BULK_COLUMNS tables."""
+    conn = get_connection()
+    return conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+
+
+def max_text_lengths(table, columns):
+    """{column: longest value's length} for text columns of a BULK_COLUMNS table."""
+    if not columns:
+        return {}
+    conn = get_connection()
+    row = conn.execute(f"SELECT {', '.join(f'max(length({col}))' for col in columns)} FROM {table}").fetchone()
+    return {col: length or 0 for col, length in zip(columns, row)}
+
+
+def iter_table_rows(table, limit, batch_size):
+    """Yield lists of up to batch_size BULK_COLUMNS rows of a table, at most limit rows in all."""
+    conn = get_connection()
+    c = conn.execute(f"SELECT {', '.join(BULK_COLUMNS[table])} FROM {table} ORDER BY rowid LIMIT ?", (limit,))
+    while True:
+        rows = c.fetchmany(batch_size)
+        if not rows:
+            return
+        yield rows
+
+
+def bulk_upsert(table, rows):
+    """Merge BULK_COLUMNS-ordered rows into a table in one transaction."""
+    conn = get_connection()
+    with conn:
+        conn.executemany(BULK_UPSERT_SQL[table], rows)
+
+
+def screen_tickers(max_avg_abs_move=None, min_cycles=None, limit=None):
+    """
+    Screen tickers by their stored move statistics, most consistent first
+    (lowest move variance). Tickers with fewer than two cycles have no variance
+    and are left out. Returns (ticker, cycles, avg_move, avg_abs_move,
+    move_variance, within_expected_count, expected_count) rows.
+    """
+    conn = get_connection()
+    c = conn.cursor()
+    c.execute('''
+        SELECT ticker, cycles, avg_move, avg_abs_move, move_variance,
+               within_expected_count, expected_count
+        FROM ticker_stats
+        WHERE avg_abs_move < COALESCE(?, 1e308) AND cycles >= COALESCE(?, 0)
+          AND move_variance IS NOT NULL
+        ORDER BY move_variance
+        LIMIT COALESCE(?, -1)
+    ''', (max_avg_abs_move, min_cycles, limit))
+    rows = c.fetchall()
+    return rows
 
 
 if __name__ == "__main__":
@@ -0,0 +1,148 @@
+"""
+Bulk export/import of the database as columnar .npy files.
+
+    python dataset.py export dataset/      # earnings_history, watchlist, cached prices
+    python dataset.py import dataset/      # merge an export into trading_data.db
+
+An export is a directory holding manifest.json and one folder per table with
+one .npy file per column. Columns are plain fixed-width arrays, so
+load_dataset() memory-maps them instead of reading them in: text is
+fixed-width unicode, dates are datetime64[D] and numbers are float64 with
+NaN for NULL.
+"""
+import json
+import os
+import sys
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from database import (init_db, BULK_COLUMNS, count_table_rows, max_text_lengths,
+                      iter_table_rows, bulk_upsert)
+from summary_cache import invalidate_results
+
+FORMAT_VERSION = 1
+
+# Rows read from SQLite, or upserted into it, per batch
+BATCH_ROWS = 50_000
+
+DATE_COLUMNS = {"earnings_date", "date", "start_date", "end_date"}
+TEXT_COLUMNS = {"ticker", "notes", "date_added"}
+
+
+def _dtype(column, widths):
+    if column in DATE_COLUMNS:
+        return np.dtype("datetime64[D]")
+    if column in TEXT_COLUMNS:
+        return np.dtype(f"U{max(widths.get(column, 0), 1)}")
+    return np.dtype("f8")
+
+
+def _to_array(column, values, dtype):
+    """SQLite values to a column array; NULL becomes NaT, "" or NaN."""
+    if column in DATE_COLUMNS:
+        return np.array([value or "NaT" for value in values], dtype=dtype)
+    if column in TEXT_COLUMNS:
+        return np.array([value or "" for value in values], dtype=dtype)
+    return np.array(values, dtype=dtype)
+
+
+def _to_values(column, array):
+    """A column array back to SQLite values, the inverse of _to_array."""
+    if column in DATE_COLUMNS:
+        return [None if value == "NaT" else value for value in np.datetime_as_string(array, unit="D")]
+    if column in TEXT_COLUMNS:
+        return [value or None for value in array.tolist()]
+    return [None if value != value else value for value in array.tolist()]
+
+
+def export_dataset(path, tables=None):
+    """
+    Write tables (default: every BULK_COLUMNS table) to path, one column at a
+    time in BATCH_ROWS chunks so the whole table is never held in memory.
+    Returns {table: rows written}.
+    """
+    tables = tables or list(BULK_COLUMNS)
+    manifest = {"format": FORMAT_VERSION, "tables": {}}
+
+    for table in tables:
+        columns = BULK_COLUMNS[table]
+        folder = os.path.join(path, table)
+        os.makedirs(folder, exist_ok=True)
+
+        rows = count_table_rows(table)
+        widths = max_text_lengths(table, [col for col in columns if col in TEXT_COLUMNS])
+        dtypes = {col: _dtype(col, widths) for col in columns}
+        arrays = {col: open_memmap(os.path.join(folder, f"{col}.npy"), mode="w+",
+                                   dtype=dtypes[col], shape=(rows,))
+                  for col in columns}
+
+        written = 0
+        for batch in iter_table_rows(table, rows, BATCH_ROWS):
+            for col, values in zip(columns, zip(*batch)):
+                arrays[col][written:written + len(batch)] = _to_array(col, values, dtypes[col])
+            written += len(batch)
+        for array in arrays.values():
+            array.flush()
+
+        # Rows deleted mid-export leave unused space at the end; the manifest count is authoritative
+        manifest["tables"][table] = {"rows": written,
+                                     "columns": {col: dtypes[col].str for col in columns}}
+
+    with open(os.path.join(path, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return {table: info["rows"] for table, info in manifest["tables"].items()}
+
+
+def load_dataset(path, tables=None):
+    """
+    Memory-map an export: {table: {column: read-only array}}. Nothing is read
+    from disk until the arrays are used.
+    """
+    with open(os.path.join(path, "manifest.json")) as f:
+        manifest = json.load(f)
+    if manifest.get("format") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported dataset format: {manifest.get('format')}")
+
+    dataset = {}
+    for table, info in manifest["tables"].items():
+        if tables and table not in tables:
+            continue
+        dataset[table] = {
+            col: np.load(os.path.join(path, table, f"{col}.npy"), mmap_mode="r")[:info["rows"]]
+            for col in info["columns"]
+        }
+    return dataset
+
+
+def import_dataset(path, tables=None):
+    """
+    Merge an export into the database in BATCH_ROWS transactions, using each
+    table's BULK_UPSERT_SQL. Returns {table: rows imported}.
+    """
+    dataset = load_dataset(path, tables)
+    imported = {}
+    for table in BULK_COLUMNS:
+        if table not in dataset:
+            continue
+        columns = dataset[table]
+        rows = len(columns[BULK_COLUMNS[table][0]])
+        for start in range(0, rows, BATCH_ROWS):
+            values = [_to_values(col, columns[col][start:start + BATCH_ROWS]) for col in BULK_COLUMNS[table]]
+            bulk_upsert(table, list(zip(*values)))
+        imported[table] = rows
+
+    invalidate_results()
+    return imported
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3 or sys.argv[1] not in ("export", "import"):
+        print("Usage: python dataset.py export|import DIRECTORY")
+        sys.exit(1)
+
+    init_db()
+    command, path = sys.argv[1:]
+    counts = export_dataset(path) if command == "export" else import_dataset(path)
+    for table, rows in counts.items():
+        print(f"  {table}: {rows} rows {command}ed")
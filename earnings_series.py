@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+
+# Per-earnings columns, stored side by side in one NumPy structured array
+FLOAT_FIELDS = ["move_pct", "expected_move_pct", "eps_estimate", "eps_actual", "gap_pct",
+                "move_3d_pct", "move_5d_pct", "high_excursion_pct", "low_excursion_pct"]
+SERIES_DTYPE = np.dtype([("date", "datetime64[D]")] + [(field, "f8") for field in FLOAT_FIELDS])
+
+# get_earnings_history row position of each field
+HISTORY_ROW_FIELDS = {"expected_move_pct": 2, "move_pct": 3, "eps_estimate": 5, "eps_actual": 6,
+                      "gap_pct": 9, "move_3d_pct": 10, "move_5d_pct": 11,
+                      "high_excursion_pct": 12, "low_excursion_pct": 13}
+
+
+def _float(value):
+    """Float value, or NaN when missing."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class EarningsSeries:
+    """
+    One ticker's per-earnings results held column-wise in a structured array,
+    in the order they were added (newest first, like the earnings calendar).
+    Missing values are NaN. Slicing returns a view sharing the same memory.
+    """
+
+    __slots__ = ("ticker", "data")
+
+    def __init__(self, ticker, data):
+        self.ticker = ticker.upper()
+        self.data = data
+
+    @classmethod
+    def from_results(cls, ticker, results):
+        """Build from result dicts (date plus any of FLOAT_FIELDS)."""
+        data = np.empty(len(results), SERIES_DTYPE)
+        data["date"] = [result["date"] for result in results]
+        for field in FLOAT_FIELDS:
+            data[field] = [_float(result.get(field)) for result in results]
+        return cls(ticker, data)
+
+    @classmethod
+    def from_history_rows(cls, ticker, rows):
+        """Build from get_earnings_history rows."""
+        data = np.empty(len(rows), SERIES_DTYPE)
+        data["date"] = [row[1] for row in rows]
+        for field in FLOAT_FIELDS:
+            position = HISTORY_ROW_FIELDS[field]
+            data[field] = [_float(row[position]) if len(row) > position else np.nan for row in rows]
+        return cls(ticker, data)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return EarningsSeries(self.ticker, self.data[index])
+        return self.row(index)
+
+    def __repr__(self):
+        return f"EarningsSeries({self.ticker!r}, {len(self)} earnings)"
+
+    @property
+    def moves(self):
+        return self.data["move_pct"]
+
+    @property
+    def dates(self):
+        """Dates as "YYYY-MM-DD" strings."""
+        return np.datetime_as_string(self.data["date"], unit="D")
+
+    def head(self, lookback):
+        """The first `lookback` earnings (the newest ones), without copying."""
+        return self[:lookback]
+
+    def since(self, date):
+        """The leading earnings on or after date, without copying (the series must be newest first)."""
+        return self[:int(np.count_nonzero(self.data["date"] >= np.datetime64(date, "D")))]
+
+    def oldest_first(self):
+        """A copy sorted by date, oldest first (for charts)."""
+        return EarningsSeries(self.ticker, np.sort(self.data, order="date"))
+
+    def row(self, i):
+        """One earnings as a result dict, with None for missing values."""
+        record = self.data[i]
+        result = {"date": str(record["date"])}
+        for field in FLOAT_FIELDS:
+            value = float(record[field])
+            result[field] = None if np.isnan(value) else value
+        return result
+
+    def rows(self):
+        """Every earnings as result dicts."""
+        return [self.row(i) for i in range(len(self))]
+
+
+def history_frame(series_list):
+    """
+    Stack many tickers' series into a frame with stats.HISTORY_COLUMNS, so the
+    stats engine can consume in-memory results without a database round trip.
+    """
+    data = np.concatenate([series.data for series in series_list]) if series_list else np.empty(0, SERIES_DTYPE)
+    tickers = np.repeat([series.ticker for series in series_list], [len(series) for series in series_list])
+    estimate, actual = data["eps_estimate"], data["eps_actual"]
+    # Same rule as database._earnings_row: both values present and non-zero
+    has_eps = ~np.isnan(estimate) & ~np.isnan(actual) & (estimate != 0) & (actual != 0)
+    return pd.DataFrame({
+        "ticker": tickers,
+        "earnings_date": np.datetime_as_string(data["date"], unit="D"),
+        "expected_move_pct": data["expected_move_pct"],
+        "actual_move_pct": data["move_pct"],
+        "beat_expected": np.nan,
+        "eps_estimate": estimate,
+        "eps_actual": actual,
+        "beat_eps": np.where(has_eps, (actual >= estimate).astype(float), np.nan),
+    })
@@ -0,0 +1,174 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+import metrics
+from throttle import yahoo
+from database import init_db, get_watchlist, save_option_snapshots
+
+# Only snapshot tickers reporting within this many days
+SNAPSHOT_HORIZON_DAYS = 14
+
+CHAIN_COLUMNS = ["strike", "bid", "ask", "lastPrice"]
+
+
+class YahooOptionsProvider:
+    """Option chains and spot prices from Yahoo Finance."""
+
+    def get_spot(self, ticker):
+        import yfinance as yf
+
+        return float(yahoo.call(("spot", ticker), lambda: yf.Ticker(ticker).fast_info["last_price"]))
+
+    def get_expirations(self, ticker):
+        import yfinance as yf
+
+        return list(yahoo.call(("options", ticker), lambda: yf.Ticker(ticker).options))
+
+    def get_chain(self, ticker, expiration):
+        """(calls, puts) frames with at least strike, bid, ask and lastPrice columns."""
+        import yfinance as yf
+
+        chain = yahoo.call(("option_chain", ticker, expiration), yf.Ticker(ticker).option_chain, expiration)
+        return chain.calls, chain.puts
+
+
+class FixtureOptionsProvider:
+    """
+    Option chains served from local JSON files instead of the network, one
+    <TICKER>.json per ticker in `directory`, shaped like:
+
+        {"spot": 187.2,
+         "chains": {"2026-10-24": {"calls": [{"strike": 185, "bid": 4.1, "ask": 4.3, "lastPrice": 4.2}, ...],
+                                   "puts": [...]}}}
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _load(self, ticker):
+        with open(os.path.join(self.directory, f"{ticker.upper()}.json")) as f:
+            return json.load(f)
+
+    def get_spot(self, ticker):
+        return float(self._load(ticker)["spot"])
+
+    def get_expirations(self, ticker):
+        return sorted(self._load(ticker)["chains"])
+
+    def get_chain(self, ticker, expiration):
+        chain = self._load(ticker)["chains"][expiration]
+        return pd.DataFrame(chain["calls"]), pd.DataFrame(chain["puts"])
+
+
+def straddle_implied_moves(chains, spots):
+    """
+    At-the-money straddle implied move for every (ticker, expiration) in one pass.
+    chains has ticker, expiration, type ("call"/"put"), strike, bid, ask, lastPrice
+    columns; spots maps ticker -> spot price. Mid prices fall back to the last
+    trade when there is no two-sided quote. Returns one row per (ticker, expiration)
+    with spot, atm_strike, straddle and implied_move_pct.
+    """
+    if chains.empty:
+        return pd.DataFrame(columns=["ticker", "expiration", "spot", "atm_strike",
+                                     "straddle", "implied_move_pct"])
+
+    bid = chains["bid"].to_numpy(dtype=float)
+    ask = chains["ask"].to_numpy(dtype=float)
+    last = chains["lastPrice"].to_numpy(dtype=float)
+    quoted = (bid > 0) & (ask > 0)
+    mid = np.where(quoted, (bid + ask) / 2, last)
+
+    frame = chains[["ticker", "expiration", "type", "strike"]].assign(mid=mid)
+    # One row per strike holding both legs; strikes missing either leg can't form a straddle.
+    # The reindex keeps both columns when no chain has a single put (or call).
+    legs = frame.pivot_table(index=["ticker", "expiration", "strike"], columns="type",
+                             values="mid", aggfunc="first")
+    legs = legs.reindex(columns=["call", "put"]).dropna(subset=["call", "put"])
+    legs = legs.reset_index().rename_axis(columns=None)
+    legs["spot"] = legs["ticker"].map(spots).astype(float)
+    legs["distance"] = (legs["strike"] - legs["spot"]).abs()
+
+    atm = legs.loc[legs.groupby(["ticker", "expiration"])["distance"].idxmin()]
+    atm = atm.assign(straddle=atm["call"] + atm["put"])
+    atm["implied_move_pct"] = (atm["straddle"] / atm["spot"] * 100).round(2)
+    return atm.rename(columns={"strike": "atm_strike"})[
+        ["ticker", "expiration", "spot", "atm_strike", "straddle", "implied_move_pct"]
+    ].reset_index(drop=True)
+
+
+def _upcoming_reports(tickers, now):
+    """{ticker: next earnings date} for tickers reporting within SNAPSHOT_HORIZON_DAYS."""
+    from data_fetcher import get_earnings_dates
+
+    horizon = pd.Timestamp(now + timedelta(days=SNAPSHOT_HORIZON_DAYS))
+    reports = {}
+    for ticker in tickers:
+        earnings = get_earnings_dates(ticker)
+        if earnings is None:
+            continue
+        dates = earnings.index.tz_localize(None) if earnings.index.tz else earnings.index
+        upcoming = dates[(dates >= pd.Timestamp(now)) & (dates <= horizon)]
+        if len(upcoming):
+            reports[ticker.upper()] = upcoming.min()
+    return reports
+
+
+def collect_chains(reports, provider):
+    """
+    Pull, per ticker, the chain for the first expiration on or after its report.
+    Returns (chains frame, {ticker: spot}).
+    """
+    frames = []
+    spots = {}
+    for ticker, report_date in reports.items():
+        try:
+            report_day = report_date.strftime("%Y-%m-%d")
+            covering = [exp for exp in provider.get_expirations(ticker) if exp >= report_day]
+            if not covering:
+                continue
+            expiration = min(covering)
+            calls, puts = provider.get_chain(ticker, expiration)
+            spots[ticker] = provider.get_spot(ticker)
+        except Exception as e:
+            metrics.emit("options_error", f"Error fetching options for {ticker}: {e}", ticker=ticker, error=str(e))
+            continue
+        for kind, legs in (("call", calls), ("put", puts)):
+            frames.append(legs.reindex(columns=CHAIN_COLUMNS).assign(ticker=ticker, expiration=expiration, type=kind))
+    chains = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    return chains, spots
+
+
+def snapshot_rows(snapshots, reports, snapshot_date):
+    """option_snapshots rows for the straddle summaries, keyed to each ticker's report date."""
+    return [
+        (row.ticker, reports[row.ticker].strftime("%Y-%m-%d"), snapshot_date, row.expiration,
+         float(row.spot), float(row.atm_strike), float(row.straddle), float(row.implied_move_pct))
+        for row in snapshots.itertuples()
+    ]
+
+
+def ingest_expected_moves(tickers, provider=None, now=None):
+    """
+    Snapshot the ATM straddle implied move for every ticker reporting soon and
+    store it as expected_move_pct for that earnings date. Returns the snapshots.
+    """
+    provider = provider or YahooOptionsProvider()
+    now = now or datetime.now()
+    reports = _upcoming_reports(tickers, now)
+    chains, spots = collect_chains(reports, provider)
+    snapshots = straddle_implied_moves(chains, spots)
+    if not snapshots.empty:
+        save_option_snapshots(snapshot_rows(snapshots, reports, now.strftime("%Y-%m-%d")))
+    return snapshots
+
+
+if __name__ == "__main__":
+    init_db()
+    tickers = [row[0] for row in get_watchlist()]
+    snapshots = ingest_expected_moves(tickers)
+    if snapshots.empty:
+        print(f"No watchlist tickers report in the next {SNAPSHOT_HORIZON_DAYS} days.")
+    else:
+        print(snapshots.to_string(index=False))
@@ -0,0 +1,147 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import metrics
+
+# Background jobs allowed to run at once
+MAX_WORKERS = 2
+
+
+class Job:
+    """One unit of background work, tracked by its group and key."""
+
+    def __init__(self, group, key, callback, on_progress=None, cancellable=False):
+        self.group = group
+        self.key = key
+        self.callback = callback
+        self.on_progress = on_progress
+        self.reports_progress = on_progress is not None
+        self.cancellable = cancellable
+        self.future = None
+        self.done = False
+        self.cancelled = threading.Event()
+
+
+class JobExecutor:
+    """
+    Bounded background executor where each group (e.g. "analysis") has one
+    current job. Submitting the same key as the current job merges with it;
+    submitting a different key cancels it. Results from cancelled or replaced
+    jobs are dropped instead of delivered, and cancellable jobs are told to
+    stop early.
+
+    dispatch(fn) runs fn on the thread callbacks should run on (e.g. Tk's
+    after(0, fn)). on_change(queued, running) is dispatched whenever the
+    queue changes.
+    """
+
+    def __init__(self, max_workers=MAX_WORKERS, dispatch=None, on_change=None):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._lock = threading.Lock()
+        self._current = {}
+        self._queued = set()
+        self._running = set()
+        self._dispatch = dispatch or (lambda fn: fn())
+        self._on_change = on_change
+
+    def submit(self, group, key, fn, callback, on_progress=None, cancellable=False):
+        """
+        Run fn() in the background and deliver its result to callback(result).
+        With on_progress, fn is called as fn(report) instead, and each
+        report(item) is delivered to on_progress(item) while the job is current.
+        With cancellable, fn also gets cancelled=<threading.Event> and should
+        return early once it is set.
+        Returns the Job doing the work, which may be an existing one it merged with.
+        """
+        with self._lock:
+            current = self._current.get(group)
+            if current and current.key == key and not current.done and not current.cancelled.is_set():
+                # Same request already in flight: the newest caller gets the result
+                current.callback = callback
+                current.on_progress = on_progress
+                return current
+            if current:
+                self._cancel(current)
+
+            job = Job(group, key, callback, on_progress, cancellable)
+            self._current[group] = job
+            self._queued.add(job)
+            job.future = self._pool.submit(self._run, job, fn)
+
+        self._notify()
+        return job
+
+    def cancel(self, group):
+        """Cancel a group's current job, if it has one."""
+        with self._lock:
+            job = self._current.pop(group, None)
+            if job:
+                self._cancel(job)
+        self._notify()
+
+    def _cancel(self, job):
+        # Queued jobs never start; running ones see the event if cancellable, and their result is dropped
+        job.cancelled.set()
+        if job.future.cancel():
+            self._queued.discard(job)
+
+    def _is_current(self, job):
+        return not job.cancelled.is_set() and self._current.get(job.group) is job
+
+    def _run(self, job, fn):
+        with self._lock:
+            self._queued.discard(job)
+            if job.cancelled.is_set():
+                return
+            self._running.add(job)
+        self._notify()
+
+        args = [lambda item: self._report(job, item)] if job.reports_progress else []
+        kwargs = {"cancelled": job.cancelled} if job.cancellable else {}
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            metrics.emit("job_failed", f"Background job {job.key} failed: {e}", key=job.key, error=str(e))
+            result = None
+
+        with self._lock:
+            self._running.discard(job)
+            job.done = True
+            deliver = self._is_current(job)
+        self._notify()
+
+        if deliver:
+            self._dispatch(lambda: self._deliver(job, result))
+
+    def _report(self, job, item):
+        def deliver():
+            if self._is_current(job) and job.on_progress:
+                job.on_progress(item)
+
+        if self._is_current(job):
+            self._dispatch(deliver)
+
+    def _deliver(self, job, result):
+        # Re-checked on the dispatch thread: a newer job may have replaced this one meanwhile
+        with self._lock:
+            if not self._is_current(job):
+                return
+            del self._current[job.group]
+        job.callback(result)
+
+    def status(self):
+        """(queued, running) job counts."""
+        with self._lock:
+            return len(self._queued), len(self._running)
+
+    def _notify(self):
+        if self._on_change:
+            queued, running = self.status()
+            self._dispatch(lambda: self._on_change(queued, running))
+
+    def shutdown(self):
+        """Cancel everything queued and stop accepting work."""
+        with self._lock:
+            for job in list(self._current.values()):
+                self._cancel(job)
+            self._current.clear()
+        self._pool.shutdown(wait=False, cancel_futures=True)
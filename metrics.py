@@ -0,0 +1,188 @@
+"""
+Stage timings, counters and progress events for the analysis hot path.
+
+Progress messages go through emit() instead of print(), to one sink:
+    "console"  print the message (default)
+    "log"      the "trading_tools" logger, message plus fields as JSON
+    "json"     one JSON object per line, appended to a file
+    None       dropped
+
+Timing is off by default; while it is off, stage() hands back a shared no-op
+context manager so instrumented code pays one attribute check per call.
+"""
+import bisect
+import json
+import logging
+import threading
+import time
+from contextlib import nullcontext
+
+# Latency histogram bucket upper bounds, in milliseconds (the last bucket is open-ended)
+BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+
+TIMING = False
+SINK = "console"
+JSON_PATH = None
+
+logger = logging.getLogger("trading_tools")
+
+_lock = threading.Lock()
+_stages = {}
+_counters = {}
+_registered = {}
+_NOOP = nullcontext()
+
+
+def configure(timing=None, sink="unchanged", path=None):
+    """Switch stage timing on/off and pick where emit() sends events (see module docstring)."""
+    global TIMING, SINK, JSON_PATH
+    if timing is not None:
+        TIMING = timing
+    if sink != "unchanged":
+        if sink not in ("console", "log", "json", None):
+            raise ValueError(f"Unknown metrics sink: {sink}")
+        if sink == "json" and not path:
+            raise ValueError("The json sink needs a path")
+        SINK = sink
+        JSON_PATH = path
+
+
+def emit(event, message=None, **fields):
+    """Report a progress event: a short name, the human-readable line, and its data."""
+    if SINK is None:
+        return
+    if SINK == "console":
+        if message is not None:
+            print(message)
+        return
+
+    record = {"event": event, **fields}
+    if message is not None:
+        record["message"] = message.strip()
+    if SINK == "log":
+        logger.info(json.dumps(record, default=str))
+        return
+    record["time"] = time.time()
+    with _lock:
+        with open(JSON_PATH, "a") as f:
+            f.write(json.dumps(record, default=str) + "\n")
+
+
+class _Timer:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+def stage(name):
+    """Context manager timing one call of a stage (no-op while timing is off)."""
+    if not TIMING:
+        return _NOOP
+    return _Timer(name)
+
+
+def record(name, seconds):
+    """Add one latency sample to a stage's histogram."""
+    ms = seconds * 1000
+    with _lock:
+        hist = _stages.get(name)
+        if hist is None:
+            hist = _stages[name] = {"calls": 0, "total_ms": 0.0, "max_ms": 0.0,
+                                    "buckets": [0] * (len(BUCKETS_MS) + 1)}
+        hist["calls"] += 1
+        hist["total_ms"] += ms
+        hist["max_ms"] = max(hist["max_ms"], ms)
+        hist["buckets"][bisect.bisect_left(BUCKETS_MS, ms)] += 1
+
+
+def count(name, n=1):
+    """Bump a counter (no-op while timing is off)."""
+    if not TIMING:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def register_counters(name, stats):
+    """Include an existing stats dict (e.g. price_cache.cache_stats) in every report."""
+    _registered[name] = stats
+
+
+def snapshot(registered=True):
+    """Everything recorded so far as a JSON-serializable dict, optionally without registered stats."""
+    with _lock:
+        stages = {name: {**hist, "buckets": list(hist["buckets"])} for name, hist in _stages.items()}
+        counters = dict(_counters)
+    for name, stats in (_registered.items() if registered else ()):
+        for key, value in stats.items():
+            counters[f"{name}.{key}"] = counters.get(f"{name}.{key}", 0) + value
+    return {"stages": stages, "counters": counters}
+
+
+def merge(other):
+    """Fold a snapshot from another process (e.g. a refresh worker) into this one."""
+    with _lock:
+        for name, theirs in other["stages"].items():
+            hist = _stages.setdefault(name, {"calls": 0, "total_ms": 0.0, "max_ms": 0.0,
+                                             "buckets": [0] * (len(BUCKETS_MS) + 1)})
+            hist["calls"] += theirs["calls"]
+            hist["total_ms"] += theirs["total_ms"]
+            hist["max_ms"] = max(hist["max_ms"], theirs["max_ms"])
+            hist["buckets"] = [a + b for a, b in zip(hist["buckets"], theirs["buckets"])]
+        for name, value in other["counters"].items():
+            _counters[name] = _counters.get(name, 0) + value
+
+
+def reset():
+    """Forget every timing and counter recorded so far (registered stats dicts are left alone)."""
+    with _lock:
+        _stages.clear()
+        _counters.clear()
+
+
+def _percentile(buckets, calls, fraction):
+    # Upper bound of the bucket holding the given fraction of calls
+    target = calls * fraction
+    seen = 0
+    for bound, n in zip(BUCKETS_MS + [float("inf")], buckets):
+        seen += n
+        if seen >= target:
+            return bound
+    return float("inf")
+
+
+def format_report(data=None):
+    """Plain-text table of a snapshot: calls, mean, p50/p95 bucket bounds and max per stage."""
+    data = data or snapshot()
+    lines = [f"{'Stage':<16}{'Calls':>7}{'Mean ms':>10}{'p50 <=':>9}{'p95 <=':>9}{'Max ms':>10}"]
+    for name, hist in sorted(data["stages"].items()):
+        calls = hist["calls"]
+        lines.append(f"{name:<16}{calls:>7}{hist['total_ms'] / calls:>10.1f}"
+                     f"{_percentile(hist['buckets'], calls, 0.5):>9g}"
+                     f"{_percentile(hist['buckets'], calls, 0.95):>9g}{hist['max_ms']:>10.1f}")
+    if data["counters"]:
+        lines.append("")
+        lines.extend(f"{name:<32}{value:>8}" for name, value in sorted(data["counters"].items()))
+    return "\n".join(lines)
+
+
+def dump_report(path=None):
+    """Write the run's report to a .json file, or print it as a table when no path is given."""
+    data = snapshot()
+    if path and path.lower().endswith(".json"):
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
+    elif path:
+        with open(path, "w") as f:
+            f.write(format_report(data) + "\n")
+    else:
+        print(format_report(data))
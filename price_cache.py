@@ -0,0 +1,151 @@
+import pandas as pd
+from datetime import datetime
+import metrics
+from database import (save_price_history, get_price_history, get_price_coverage,
+                      set_price_coverage, delete_price_history)
+from summary_cache import invalidate_results
+
+PRICE_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+# Hit/miss counters for the on-disk price cache
+cache_stats = {"hits": 0, "misses": 0, "network_calls": 0}
+metrics.register_counters("price_cache", cache_stats)
+
+
+def _merge_ranges(ranges):
+    """Merge overlapping or touching (start, end) date ranges."""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _subtract_range(ranges, start, end):
+    """Remove [start, end) from a list of (start, end) ranges."""
+    remaining = []
+    for r_start, r_end in ranges:
+        if r_end <= start or r_start >= end:
+            remaining.append((r_start, r_end))
+            continue
+        if r_start < start:
+            remaining.append((r_start, start))
+        if r_end > end:
+            remaining.append((end, r_end))
+    return remaining
+
+
+def missing_ranges(coverage, start, end):
+    """Sub-ranges of [start, end) not yet covered by the fetched ranges."""
+    gaps = [(start, end)]
+    for c_start, c_end in coverage:
+        gaps = _subtract_range(gaps, c_start, c_end)
+    return gaps
+
+
+def _frame_to_rows(hist):
+    """Convert a price frame to (date, open, high, low, close, volume) tuples."""
+    return [
+        (date.strftime("%Y-%m-%d"), *(float(bar[col]) for col in PRICE_COLUMNS))
+        for date, bar in hist[PRICE_COLUMNS].iterrows()
+    ]
+
+
+def _rows_to_frame(rows):
+    """Convert cached price rows back into a price frame with a naive DatetimeIndex."""
+    frame = pd.DataFrame(rows, columns=["Date"] + PRICE_COLUMNS)
+    frame.index = pd.DatetimeIndex(pd.to_datetime(frame.pop("Date")), name="Date")
+    return frame
+
+
+def load_price_history(ticker, start, end):
+    """Read cached bars for start <= date < end without touching the network."""
+    return _rows_to_frame(get_price_history(ticker, start, end))
+
+
+def read_price_history(ticker, start, end, fetch):
+    """
+    Daily price bars for start <= date < end from the local cache, calling
+    fetch(ticker, start, end) only for ranges not yet stored. Nothing is
+    written: returns (hist, fetched), where fetched holds (start, end, frame)
+    for each fetched range, ready for store_price_history.
+    """
+    ticker = ticker.upper()
+    gaps = missing_ranges(get_price_coverage(ticker), start, end)
+    cached = load_price_history(ticker, start, end)
+
+    if not gaps:
+        cache_stats["hits"] += 1
+        return cached, []
+
+    cache_stats["misses"] += 1
+    fetched = []
+    for gap_start, gap_end in gaps:
+        cache_stats["network_calls"] += 1
+        fetched.append((gap_start, gap_end, fetch(ticker, gap_start, gap_end)))
+
+    frames = [frame for frame in [cached] + [hist[PRICE_COLUMNS].astype(float) for _, _, hist in fetched
+                                             if not hist.empty]
+              if not frame.empty]
+    if not frames:
+        return cached, fetched
+    hist = pd.concat(frames) if len(frames) > 1 else frames[0]
+    return hist[~hist.index.duplicated(keep="last")].sort_index(), fetched
+
+
+def get_cached_price_history(ticker, start, end, fetch):
+    """
+    Return daily price bars for start <= date < end, reading the local cache
+    first and calling fetch(ticker, start, end) only for ranges not yet stored.
+    Bars from today onward are returned but never cached since they can still change.
+    """
+    hist, fetched = read_price_history(ticker, start, end, fetch)
+    for gap_start, gap_end, frame in fetched:
+        store_price_history(ticker, frame, gap_start, gap_end)
+    return hist
+
+
+def store_price_history(ticker, hist, start, end):
+    """
+    Save bars fetched for start <= date < end and mark that range as covered.
+    Anything from today onward is left out so it gets fetched fresh next time.
+    An empty fetch (the provider returns one on most errors) leaves the range
+    uncovered so it is retried, unless the range holds no weekdays at all.
+    """
+    ticker = ticker.upper()
+    final_end = min(end, datetime.now().strftime("%Y-%m-%d"))
+    if start >= final_end:
+        return
+    if hist.empty:
+        if len(pd.bdate_range(start, final_end, inclusive="left")):
+            return
+    else:
+        final = hist[hist.index < pd.Timestamp(final_end)]
+        save_price_history(ticker, _frame_to_rows(final))
+    set_price_coverage(ticker, _merge_ranges(get_price_coverage(ticker) + [(start, final_end)]))
+
+
+def invalidate_price_cache(ticker, start=None, end=None):
+    """
+    Drop cached bars for a ticker, e.g. after a split re-adjusts its history.
+    With start/end, only start <= date < end is dropped and re-fetched next time.
+    """
+    ticker = ticker.upper()
+    delete_price_history(ticker, start, end)
+    invalidate_results(ticker)
+    if start is None and end is None:
+        set_price_coverage(ticker, [])
+    else:
+        coverage = _subtract_range(get_price_coverage(ticker), start or "0000-01-01", end or "9999-12-31")
+        set_price_coverage(ticker, coverage)
+    metrics.emit("price_cache_cleared",
+                 f"Price cache cleared for {ticker}" + (f" ({start or '...'} to {end or '...'})" if start or end else ""),
+                 ticker=ticker, start=start, end=end)
+
+
+def reset_cache_stats():
+    """Zero the cache hit/miss counters."""
+    for key in cache_stats:
+        cache_stats[key] = 0
@@ -0,0 +1,222 @@
+"""
+Market data providers behind data_fetcher's downloads.
+
+    YahooProvider      live Yahoo Finance data, rate limited by throttle.yahoo
+    RecordingProvider  wraps another provider and saves every response as a fixture
+    ReplayProvider     serves saved fixtures offline, optionally with simulated latency
+
+Fixtures are JSON files in a directory: calendars/<TICKER>.json holds an
+earnings calendar and prices/<TICKER>.json holds every daily bar recorded
+for a ticker. Price requests are replayed by date range from those bars, so a
+replay doesn't depend on the exact windows that were recorded. Pick the
+provider with data_fetcher.set_provider().
+"""
+import json
+import os
+import time
+
+import pandas as pd
+
+from throttle import yahoo
+
+
+class YahooProvider:
+    """Earnings calendars and daily prices from Yahoo Finance."""
+
+    def earnings_dates(self, ticker):
+        """Earnings calendar frame (tz-aware index), or None."""
+        import yfinance as yf  # slow to import, so only loaded once something needs the network
+
+        stock = yf.Ticker(ticker)
+        return yahoo.call(("earnings_dates", ticker), lambda: stock.earnings_dates)
+
+    def price_history(self, ticker, start, end):
+        """Daily bars for start <= date < end."""
+        import yfinance as yf
+
+        stock = yf.Ticker(ticker)
+        return yahoo.call(("history", ticker, start, end), stock.history, start=start, end=end)
+
+    def price_histories(self, tickers, start, end):
+        """Daily bars for many tickers in one request, columns grouped by ticker."""
+        import yfinance as yf
+
+        return yahoo.call(("download", tuple(tickers), start, end), yf.download, list(tickers),
+                          start=start, end=end, group_by="ticker", auto_adjust=True,
+                          progress=False, threads=True)
+
+
+def frame_to_json(frame):
+    """A provider frame as JSON-safe data; tz-aware indexes are stored in UTC with their zone."""
+    index = frame.index
+    tz = str(index.tz) if getattr(index, "tz", None) is not None else None
+    if tz:
+        index = index.tz_convert("UTC").tz_localize(None)
+    return {
+        "index_name": frame.index.name,
+        "tz": tz,
+        "index": [stamp.isoformat() for stamp in index],
+        "columns": [list(col) if isinstance(col, tuple) else col for col in frame.columns],
+        "dtypes": [str(dtype) for dtype in frame.dtypes],
+        "data": frame.astype(object).where(frame.notna(), None).values.tolist(),
+    }
+
+
+def frame_from_json(data):
+    """The inverse of frame_to_json."""
+    index = pd.DatetimeIndex(pd.to_datetime(data["index"]), name=data["index_name"])
+    if data["tz"]:
+        index = index.tz_localize("UTC").tz_convert(data["tz"])
+    columns = data["columns"]
+    if columns and isinstance(columns[0], list):
+        columns = pd.MultiIndex.from_tuples([tuple(col) for col in columns])
+    frame = pd.DataFrame(data["data"], index=index, columns=columns)
+    for i, dtype in enumerate(data["dtypes"]):
+        frame.isetitem(i, frame.iloc[:, i].astype(dtype))
+    return frame
+
+
+def _naive(frame):
+    if getattr(frame.index, "tz", None) is not None:
+        frame = frame.copy()
+        frame.index = frame.index.tz_localize(None)
+    return frame
+
+
+def _split_download(data, tickers):
+    """{ticker: bars} from a bulk download frame grouped by ticker."""
+    if data is None or data.empty:
+        return {}
+    return {ticker: data[ticker].dropna(how="all") for ticker in tickers
+            if ticker in data.columns.get_level_values(0)}
+
+
+class FixtureStore:
+    """Reads and writes the fixture files in one directory."""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _path(self, kind, ticker):
+        return os.path.join(self.directory, kind, f"{ticker.upper()}.json")
+
+    def _read(self, kind, ticker):
+        path = self._path(kind, ticker)
+        if not os.path.exists(path):
+            raise KeyError(f"No {kind} fixture for {ticker.upper()} in {self.directory}")
+        with open(path) as f:
+            return json.load(f)
+
+    def _write(self, kind, ticker, data):
+        path = self._path(kind, ticker)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(data, f)
+
+    def tickers(self):
+        """Tickers with a recorded calendar."""
+        folder = os.path.join(self.directory, "calendars")
+        if not os.path.isdir(folder):
+            return []
+        return sorted(name[:-5] for name in os.listdir(folder) if name.endswith(".json"))
+
+    def load_calendar(self, ticker):
+        data = self._read("calendars", ticker)
+        return None if data is None else frame_from_json(data)
+
+    def save_calendar(self, ticker, earnings):
+        self._write("calendars", ticker, None if earnings is None else frame_to_json(earnings))
+
+    def load_prices(self, ticker):
+        return frame_from_json(self._read("prices", ticker))
+
+    def save_prices(self, ticker, bars):
+        """Merge bars (dates made tz-naive) into the ticker's recorded bars; newer values win."""
+        bars = _naive(bars)
+        try:
+            bars = pd.concat([self.load_prices(ticker), bars])
+        except KeyError:
+            pass
+        bars = bars[~bars.index.duplicated(keep="last")].sort_index()
+        self._write("prices", ticker, frame_to_json(bars))
+
+
+class RecordingProvider:
+    """Passes requests through to `provider` and saves each response to a fixture directory."""
+
+    def __init__(self, directory, provider=None):
+        self.provider = provider or YahooProvider()
+        self.store = FixtureStore(directory)
+
+    def earnings_dates(self, ticker):
+        earnings = self.provider.earnings_dates(ticker)
+        self.store.save_calendar(ticker, earnings)
+        return earnings
+
+    def price_history(self, ticker, start, end):
+        hist = self.provider.price_history(ticker, start, end)
+        if not hist.empty:
+            self.store.save_prices(ticker, hist)
+        return hist
+
+    def price_histories(self, tickers, start, end):
+        data = self.provider.price_histories(tickers, start, end)
+        for ticker, hist in _split_download(data, tickers).items():
+            if not hist.empty:
+                self.store.save_prices(ticker, hist)
+        return data
+
+
+class ReplayProvider:
+    """
+    Serves recorded fixtures, sleeping `latency` seconds per request to stand in
+    for the network. Tickers with no fixture raise KeyError. Fixtures are read
+    once and kept in memory.
+    """
+
+    def __init__(self, directory, latency=0.0, sleep=time.sleep):
+        self.store = FixtureStore(directory)
+        self.latency = latency
+        self._sleep = sleep
+        self._calendars = {}
+        self._prices = {}
+
+    def __getstate__(self):
+        # Process-pool workers get the settings, not the loaded fixtures
+        return {"store": self.store, "latency": self.latency, "_sleep": self._sleep,
+                "_calendars": {}, "_prices": {}}
+
+    def _wait(self):
+        if self.latency:
+            self._sleep(self.latency)
+
+    def _bars(self, ticker, start, end):
+        ticker = ticker.upper()
+        if ticker not in self._prices:
+            self._prices[ticker] = self.store.load_prices(ticker)
+        bars = self._prices[ticker]
+        return bars[(bars.index >= pd.Timestamp(start)) & (bars.index < pd.Timestamp(end))].copy()
+
+    def earnings_dates(self, ticker):
+        self._wait()
+        ticker = ticker.upper()
+        if ticker not in self._calendars:
+            self._calendars[ticker] = self.store.load_calendar(ticker)
+        earnings = self._calendars[ticker]
+        return None if earnings is None else earnings.copy()
+
+    def price_history(self, ticker, start, end):
+        self._wait()
+        return self._bars(ticker, start, end)
+
+    def price_histories(self, tickers, start, end):
+        self._wait()
+        frames = {}
+        for ticker in tickers:
+            try:
+                bars = self._bars(ticker, start, end)
+            except KeyError:
+                continue
+            if not bars.empty:
+                frames[ticker] = bars
+        return pd.concat(frames, axis=1) if frames else pd.DataFrame()
@@ -0,0 +1,229 @@
+"""
+Headless nightly refresh of a ticker universe into trading_data.db.
+
+    python refresh.py                          # every ticker on the watchlist
+    python refresh.py --universe sp500.txt     # one ticker per line (or first CSV column)
+    python refresh.py --output ranking.csv     # also write the ranking (.csv or .json)
+    python refresh.py --profile timings.json   # time every stage and write a report
+
+Tickers are analyzed across a process pool. Workers only read the database;
+every row is written by this process. An interrupted run resumes where it
+left off when the same command is run again (use --restart to start over).
+"""
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+import data_fetcher
+import database
+import metrics
+import throttle
+from database import (init_db, get_watchlist, save_earnings_batch,
+                      start_refresh_run, mark_refresh_ticker, get_refresh_progress,
+                      finish_refresh_run, get_calendar_fetch)
+from calendar_cache import calendar_is_stale, load_earnings_dates, store_earnings_dates
+from price_cache import read_price_history, store_price_history
+from data_fetcher import (_download_earnings_dates, _download_price_history, get_past_earnings,
+                          price_window, calculate_move_horizons, build_results,
+                          summarize_results)
+from scanner import RANK_FIELDS
+
+
+def load_universe(path):
+    """Read tickers from a file: one per line or the first CSV column, '#' for comments."""
+    tickers = []
+    with open(path, newline="") as f:
+        for row in csv.reader(f):
+            if not row or not row[0].strip() or row[0].strip().startswith("#"):
+                continue
+            ticker = row[0].strip().upper()
+            if ticker in ("TICKER", "SYMBOL"):
+                continue  # header row
+            if ticker not in tickers:
+                tickers.append(ticker)
+    return tickers
+
+
+def _init_worker(db_path, timing, workers, provider):
+    database.DB_PATH = db_path
+    data_fetcher.set_provider(provider)
+    # Each worker gets an equal share of the provider rate limit
+    yahoo = throttle.yahoo
+    yahoo.set_rate(yahoo.rate / workers, yahoo.max_rate / workers)
+    # Workers report through the parent: timings ride back with each result, events are dropped
+    metrics.configure(timing=timing, sink=None)
+
+
+def _analyze_for_refresh(ticker, lookback):
+    """
+    Worker-process analysis of one ticker. Reads the stored calendar and price
+    cache, fetches only what is missing, and returns everything to be written
+    instead of writing it: (ticker, ranking_row, records, calendar, prices, timings),
+    where timings is this call's metrics snapshot.
+    """
+    metrics.reset()
+    ticker, ranking, records, calendar, prices = _analyze_ticker(ticker, lookback)
+    return ticker, ranking, records, calendar, prices, metrics.snapshot(registered=False) if metrics.TIMING else None
+
+
+def _analyze_ticker(ticker, lookback):
+    """The analysis behind _analyze_for_refresh, minus the timings."""
+    calendar = None
+    prices = []
+
+    with metrics.stage("calendar_fetch"):
+        if calendar_is_stale(get_calendar_fetch(ticker)):
+            calendar = _download_earnings_dates(ticker)
+            if calendar is None:
+                # Sent back empty so the parent still records the fetch
+                calendar = pd.DataFrame()
+        earnings = calendar
+        if earnings is None or earnings.empty:
+            earnings = load_earnings_dates(ticker, fresh_only=False)
+    if earnings is None:
+        return ticker, None, [], calendar, prices
+
+    past_earnings = get_past_earnings(earnings.copy(), lookback)
+    if past_earnings.empty:
+        return ticker, None, [], calendar, prices
+
+    earnings_dates = [date.to_pydatetime().replace(tzinfo=None) for date in past_earnings.index]
+    start, end = price_window(earnings_dates)
+    with metrics.stage("price_fetch"):
+        # The fetched ranges go back to the parent, which stores them
+        hist, prices = read_price_history(ticker, start, end, _download_price_history)
+
+    with metrics.stage("move_calc"):
+        moves = list(zip(earnings_dates, calculate_move_horizons(hist, earnings_dates)))
+    results, records = build_results(past_earnings, moves)
+    if not results:
+        return ticker, None, records, calendar, prices
+    summary = summarize_results(ticker, results)
+
+    ranking = {field: summary[field] for field in RANK_FIELDS}
+    ranking = {k: float(v) if isinstance(v, float) else v for k, v in ranking.items()}
+    return ticker, ranking, records, calendar, prices
+
+
+def _write_result(run_id, ticker, ranking, records, calendar, prices, timings):
+    """Save one worker's output. Runs in the parent, the only database writer."""
+    if timings:
+        metrics.merge(timings)
+    with metrics.stage("db_write"):
+        _save_result(run_id, ticker, ranking, records, calendar, prices)
+
+
+def _save_result(run_id, ticker, ranking, records, calendar, prices):
+    if calendar is not None:
+        store_earnings_dates(ticker, calendar)
+    for start, end, hist in prices:
+        store_price_history(ticker, hist, start, end)
+    if records:
+        save_earnings_batch(ticker, records)
+    mark_refresh_ticker(run_id, ticker, "done" if ranking else "failed",
+                        json.dumps(ranking) if ranking else None)
+
+
+def refresh(tickers, run_id, lookback=8, workers=None, restart=False):
+    """
+    Analyze every ticker across a process pool, skipping those an unfinished
+    run with the same run_id already analyzed successfully (failures are retried). Returns the ranking rows for
+    every ticker the run has analyzed, smallest avg_abs_move first.
+    """
+    resumed = start_refresh_run(run_id, restart)
+    # Failed tickers are tried again
+    finished = {row[0] for row in get_refresh_progress(run_id) if row[1] == "done"}
+    todo = [t for t in tickers if t not in finished]
+    if resumed:
+        metrics.emit("refresh_resume", f"Resuming run: {len(finished)} done, {len(todo)} to go",
+                     done=len(finished), todo=len(todo))
+
+    done = len(finished)
+    context = multiprocessing.get_context("spawn")  # no inherited SQLite handles
+    initargs = (database.DB_PATH, metrics.TIMING, workers or os.cpu_count() or 1, data_fetcher.provider)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_init_worker, initargs=initargs) as pool:
+        futures = {pool.submit(_analyze_for_refresh, t, lookback): t for t in todo}
+        try:
+            for future in as_completed(futures):
+                ticker = futures[future]
+                try:
+                    _write_result(run_id, *future.result())
+                except Exception as e:
+                    metrics.emit("analyze_error", f"Error analyzing {ticker}: {e}", ticker=ticker, error=str(e))
+                    mark_refresh_ticker(run_id, ticker, "failed")
+                done += 1
+                metrics.emit("refresh_progress", f"[{done}/{len(tickers)}] {ticker}",
+                             done=done, total=len(tickers), ticker=ticker)
+        except KeyboardInterrupt:
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    finish_refresh_run(run_id)
+    rows = [json.loads(row[2]) for row in get_refresh_progress(run_id) if row[2]]
+    return sorted(rows, key=lambda row: row["avg_abs_move"])
+
+
+def write_ranking(rows, path):
+    """Write ranking rows to a .csv or .json file."""
+    if path.lower().endswith(".json"):
+        with open(path, "w") as f:
+            json.dump(rows, f, indent=2)
+        return
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=RANK_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Refresh earnings moves for a ticker universe.")
+    parser.add_argument("--universe", help="ticker file (default: the watchlist)")
+    parser.add_argument("--lookback", type=int, default=8, help="earnings cycles per ticker")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--output", help="write the ranking to this .csv or .json file")
+    parser.add_argument("--restart", action="store_true", help="ignore an interrupted run and start over")
+    parser.add_argument("--profile", nargs="?", const="", metavar="PATH",
+                        help="time every stage and print a report at the end (or write it to PATH)")
+    parser.add_argument("--events", metavar="PATH", help="write progress events to PATH as JSON lines")
+    args = parser.parse_args(argv)
+    if args.events:
+        metrics.configure(sink="json", path=args.events)
+    if args.profile is not None:
+        metrics.configure(timing=True)
+
+    init_db()
+    if args.universe:
+        tickers = load_universe(args.universe)
+        source = os.path.abspath(args.universe)
+    else:
+        tickers = [row[0] for row in get_watchlist()]
+        source = "watchlist"
+    if not tickers:
+        print("No tickers to refresh.")
+        return 1
+
+    run_id = f"{source}|lookback={args.lookback}"
+    try:
+        rows = refresh(tickers, run_id, args.lookback, args.workers, args.restart)
+    except KeyboardInterrupt:
+        print("\nInterrupted. Run the same command again to resume.")
+        return 130
+
+    print(f"\nRefreshed {len(rows)} of {len(tickers)} tickers")
+    if args.output:
+        write_ranking(rows, args.output)
+        print(f"Ranking written to {args.output}")
+    if args.profile is not None:
+        metrics.dump_report(args.profile or None)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
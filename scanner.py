@@ -0,0 +1,116 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import metrics
+from throttle import ProviderError
+from data_fetcher import (analyze_ticker, get_earnings_dates, get_past_earnings,
+                          price_window, download_price_histories)
+from database import get_watchlist, get_price_coverage
+from price_cache import store_price_history, missing_ranges
+
+# Worker threads used for per-ticker fetches and analysis
+MAX_WORKERS = 8
+
+# Tickers per bulk price download request
+BULK_CHUNK_SIZE = 50
+
+# Summary fields shown in the ranking, in column order
+RANK_FIELDS = ["ticker", "avg_abs_move", "avg_move", "max_move", "min_move",
+               "earnings_analyzed", "positive_reactions", "negative_reactions"]
+
+
+def _prefetch_prices(calendars, lookback):
+    """
+    Warm the price cache for every ticker with bulk multi-ticker downloads,
+    so the per-ticker analysis afterwards is served from disk.
+    """
+    windows = {}
+    for ticker, earnings in calendars.items():
+        past = get_past_earnings(earnings, lookback)
+        if past.empty:
+            continue
+        dates = [date.to_pydatetime().replace(tzinfo=None) for date in past.index]
+        start, end = price_window(dates)
+        if missing_ranges(get_price_coverage(ticker), start, end):
+            windows[ticker] = (start, end)
+
+    tickers = sorted(windows)
+    for i in range(0, len(tickers), BULK_CHUNK_SIZE):
+        chunk = tickers[i:i + BULK_CHUNK_SIZE]
+        start = min(windows[t][0] for t in chunk)
+        end = max(windows[t][1] for t in chunk)
+        try:
+            histories = download_price_histories(chunk, start, end)
+        except Exception as e:
+            metrics.emit("bulk_download_error", f"Bulk price download failed for {len(chunk)} tickers: {e}",
+                         tickers=len(chunk), error=str(e))
+            continue
+        for ticker, hist in histories.items():
+            store_price_history(ticker, hist, start, end)
+
+
+def scan_tickers(tickers, lookback=8, max_workers=MAX_WORKERS, on_progress=None):
+    """
+    Analyze many tickers on a bounded worker pool.
+    on_progress(done, total, ticker, summary) is called as each ticker finishes.
+    Returns the summaries that came back, ranked by avg_abs_move.
+    """
+    tickers = [t.upper() for t in tickers]
+    total = len(tickers)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        # Earnings calendars first, so price windows are known before downloading
+        calendars = {}
+        done = 0
+        futures = {pool.submit(get_earnings_dates, t): t for t in tickers}
+        for future in as_completed(futures):
+            ticker = futures[future]
+            try:
+                earnings = future.result()
+            except ProviderError as e:
+                # Throttled with no stored calendar to fall back on; the rest of the scan goes on
+                metrics.emit("calendar_error", f"Skipped {ticker}, provider unavailable: {e}",
+                             ticker=ticker, error=str(e))
+                earnings = None
+            if earnings is not None:
+                calendars[ticker] = earnings
+                continue
+            done += 1
+            if on_progress:
+                on_progress(done, total, ticker, None)
+
+        _prefetch_prices(calendars, lookback)
+
+        summaries = []
+        futures = {pool.submit(analyze_ticker, t, lookback, calendars[t]): t for t in calendars}
+        for future in as_completed(futures):
+            ticker = futures[future]
+            try:
+                summary = future.result()
+            except Exception as e:
+                metrics.emit("analyze_error", f"Error analyzing {ticker}: {e}", ticker=ticker, error=str(e))
+                summary = None
+            if summary is not None:
+                summaries.append(summary)
+            done += 1
+            if on_progress:
+                on_progress(done, total, ticker, summary)
+
+    return rank_results(summaries)
+
+
+def scan_watchlist(lookback=8, max_workers=MAX_WORKERS, on_progress=None):
+    """Analyze every ticker on the watchlist. See scan_tickers."""
+    tickers = [row[0] for row in get_watchlist()]
+    return scan_tickers(tickers, lookback, max_workers, on_progress)
+
+
+def rank_results(summaries, key="avg_abs_move", descending=False):
+    """Sort scan summaries into ranking rows, smallest avg_abs_move first by default."""
+    rows = [{field: summary[field] for field in RANK_FIELDS} for summary in summaries]
+    return sorted(rows, key=lambda row: row[key], reverse=descending)
+
+
+if __name__ == "__main__":
+    ranking = scan_watchlist(on_progress=lambda done, total, ticker, _: print(f"[{done}/{total}] {ticker}"))
+    print(f"\n{'Ticker':<8}{'Avg Abs':>10}{'Avg':>10}{'N':>5}")
+    for row in ranking:
+        print(f"{row['ticker']:<8}{row['avg_abs_move']:>9.2f}%{row['avg_move']:>+9.2f}%{row['earnings_analyzed']:>5}")
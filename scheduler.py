@@ -0,0 +1,185 @@
+"""
+Analyze watchlist earnings reports as they happen.
+
+    python scheduler.py                # one pass (e.g. hourly from cron)
+    python scheduler.py --watch 3600   # keep running, one pass an hour
+
+Each pass queues every report on the stored calendars that has passed but has
+no saved move yet (so reports missed while nothing was running are caught up),
+then analyzes the jobs whose post-earnings prices should exist by now and
+writes just those rows. Queued reports are never queued twice. A pass where
+nothing has reported does no network calls and no writes.
+"""
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+import metrics
+from throttle import ProviderError
+from database import (init_db, get_watchlist, get_calendar_fetch, get_analyzed_dates,
+                      enqueue_report_jobs, get_due_report_jobs, update_report_jobs,
+                      save_earnings_batch)
+from calendar_cache import CALENDAR_TTL_DAYS, TIMESTAMP_FORMAT, load_earnings_dates
+from summary_cache import invalidate_results
+
+# Reports further back than this aren't queued (a new watchlist ticker is analyzed from the GUI)
+CATCH_UP_DAYS = 400
+
+# Time of day the first post-report session's bar can be expected from the provider
+PRICES_READY_HOUR = 17
+
+# Hours to wait before retrying a report whose prices weren't there yet
+RETRY_HOURS = 12
+
+# Attempts before a report is marked failed
+MAX_ATTEMPTS = 6
+
+# Sessions after a report until its longest horizon (move_5d_pct) has a bar
+HORIZON_SESSIONS = 5
+
+
+def _needs_calendar(fetch_info, now):
+    """
+    Whether a stored calendar must be re-fetched for the scheduler to notice
+    new reports: none stored, its next report has passed, or (with no next
+    report on file) its TTL has run out.
+    """
+    if fetch_info is None:
+        return True
+    fetched_at, next_report_date = fetch_info
+    if next_report_date:
+        return datetime.strptime(next_report_date, TIMESTAMP_FORMAT) <= now
+    return now - datetime.strptime(fetched_at, TIMESTAMP_FORMAT) > timedelta(days=CALENDAR_TTL_DAYS)
+
+
+def due_time(report_date, sessions=1):
+    """When the price bar of a report's `sessions`-th post-earnings session should exist."""
+    session = pd.Timestamp(report_date).normalize() + pd.offsets.BDay(sessions)
+    return session.to_pydatetime() + timedelta(hours=PRICES_READY_HOUR)
+
+
+def plan_jobs(tickers, now):
+    """
+    Queue every passed, unanalyzed report on the tickers' calendars. Calendars
+    are only re-fetched when they may hold a new report. Returns the number of
+    new jobs.
+    """
+    from data_fetcher import get_earnings_dates
+
+    oldest = now - timedelta(days=CATCH_UP_DAYS)
+    rows = []
+    for ticker in tickers:
+        try:
+            if _needs_calendar(get_calendar_fetch(ticker), now):
+                earnings = get_earnings_dates(ticker, refresh=True)
+            else:
+                earnings = load_earnings_dates(ticker, fresh_only=False)
+        except ProviderError as e:
+            metrics.emit("calendar_error", f"Skipped {ticker}, provider unavailable: {e}",
+                         ticker=ticker, error=str(e))
+            continue
+        if earnings is None:
+            continue
+
+        dates = earnings.index.tz_localize(None) if earnings.index.tz else earnings.index
+        analyzed = get_analyzed_dates(ticker)
+        for date in dates[(dates <= now) & (dates >= oldest)]:
+            if date.strftime("%Y-%m-%d") not in analyzed:
+                rows.append((ticker, date.strftime("%Y-%m-%d"),
+                             due_time(date).strftime(TIMESTAMP_FORMAT)))
+    return enqueue_report_jobs(rows) if rows else 0
+
+
+def run_due_jobs(now):
+    """
+    Analyze every queued report that is due, one price request per ticker.
+    Reports whose move can't be found yet are retried later. A report saved
+    before its later horizons have bars stays queued until HORIZON_SESSIONS
+    after it, when those are filled in. Returns the tickers that got new rows.
+    """
+    from data_fetcher import _iter_moves, build_results
+
+    jobs = get_due_report_jobs(now.strftime(TIMESTAMP_FORMAT))
+    by_ticker = {}
+    for ticker, date, attempts in jobs:
+        by_ticker.setdefault(ticker, []).append((date, attempts))
+
+    updated = []
+    outcomes = []
+    for ticker, ticker_jobs in by_ticker.items():
+        try:
+            calendar = load_earnings_dates(ticker, fresh_only=False)
+            if calendar.index.tz:
+                calendar.index = calendar.index.tz_localize(None)
+            days = calendar.index.strftime("%Y-%m-%d")
+            wanted = [date for date, _ in ticker_jobs]
+            reports = calendar[days.isin(wanted)]
+
+            earnings_dates = [date.to_pydatetime() for date in reports.index]
+            results, records = build_results(reports, _iter_moves(ticker, earnings_dates))
+            if records:
+                save_earnings_batch(ticker, records)
+                invalidate_results(ticker)
+                updated.append(ticker)
+            error = None
+        except Exception as e:
+            records = []
+            error = str(e)
+            metrics.emit("report_job_error", f"Error analyzing {ticker} reports: {e}", ticker=ticker, error=error)
+
+        saved = {record["earnings_date"]: record for record in records}
+        retry_at = (now + timedelta(hours=RETRY_HOURS)).strftime(TIMESTAMP_FORMAT)
+        for date, attempts in ticker_jobs:
+            if date in saved:
+                if saved[date].get("move_5d_pct") is not None:
+                    outcomes.append((ticker, date, "done", now.strftime(TIMESTAMP_FORMAT), None))
+                elif attempts + 1 >= MAX_ATTEMPTS:
+                    # The headline move is saved; stop waiting for bars that never came
+                    outcomes.append((ticker, date, "done", now.strftime(TIMESTAMP_FORMAT),
+                                     "later horizons missing"))
+                else:
+                    horizons_at = max(due_time(date, HORIZON_SESSIONS), now + timedelta(hours=RETRY_HOURS))
+                    outcomes.append((ticker, date, "pending", horizons_at.strftime(TIMESTAMP_FORMAT),
+                                     "waiting for later horizons"))
+            else:
+                status = "failed" if attempts + 1 >= MAX_ATTEMPTS else "pending"
+                outcomes.append((ticker, date, status, retry_at, error or "no post-earnings prices yet"))
+
+    if outcomes:
+        update_report_jobs(outcomes)
+    return updated
+
+
+def run_pass(tickers=None, now=None):
+    """One scheduler pass over the watchlist (or tickers). Returns the tickers with new rows."""
+    now = now or datetime.now()
+    if tickers is None:
+        tickers = [row[0] for row in get_watchlist()]
+    queued = plan_jobs(tickers, now)
+    if queued:
+        metrics.emit("reports_queued", f"Queued {queued} new report(s)", count=queued)
+    updated = run_due_jobs(now)
+    if updated:
+        metrics.emit("reports_analyzed", f"New earnings rows for {', '.join(updated)}", tickers=updated)
+    return updated
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyze watchlist earnings reports as they happen.")
+    parser.add_argument("--watch", type=int, metavar="SECONDS", help="keep running, one pass every SECONDS")
+    args = parser.parse_args(argv)
+
+    init_db()
+    while True:
+        if not run_pass():
+            print("Nothing new.")
+        if not args.watch:
+            return 0
+        time.sleep(args.watch)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+from database import get_connection
+from earnings_series import history_frame
+
+# Columns of earnings_history used by the stats engine
+HISTORY_COLUMNS = ["ticker", "earnings_date", "expected_move_pct", "actual_move_pct",
+                   "beat_expected", "eps_estimate", "eps_actual", "beat_eps"]
+
+
+def load_earnings_history(tickers=None):
+    """
+    Load earnings_history rows into a DataFrame, for the given tickers or all of them.
+    Rows without an actual move are left out.
+    """
+    query = f"SELECT {', '.join(HISTORY_COLUMNS)} FROM earnings_history WHERE actual_move_pct IS NOT NULL"
+    params = []
+    if tickers is not None:
+        tickers = [t.upper() for t in tickers]
+        query += f" AND ticker IN ({', '.join('?' * len(tickers))})"
+        params = tickers
+    return pd.read_sql_query(query, get_connection(), params=params)
+
+
+def compute_ticker_stats(history):
+    """
+    Per-ticker move statistics for an earnings_history frame (or a list of
+    EarningsSeries), in one grouped pass. Returns a frame indexed by ticker. within_expected_pct only counts rows with an
+    expected move, and beat_eps_avg_move / miss_eps_avg_move only rows with EPS data.
+    """
+    if not isinstance(history, pd.DataFrame):
+        history = history_frame(list(history))
+
+    frame = pd.DataFrame({
+        "ticker": history["ticker"].to_numpy(),
+        "move": history["actual_move_pct"].to_numpy(dtype=float),
+    })
+    frame["abs_move"] = frame["move"].abs()
+    frame["positive"] = frame["move"] > 0
+    frame["negative"] = frame["move"] < 0
+
+    expected = history["expected_move_pct"].to_numpy(dtype=float)
+    has_expected = ~np.isnan(expected)
+    frame["has_expected"] = has_expected
+    frame["within_expected"] = has_expected & (frame["abs_move"].to_numpy() <= np.abs(expected))
+
+    beat_eps = history["beat_eps"].to_numpy(dtype=float)
+    frame["beat_move"] = np.where(beat_eps == 1, frame["move"], np.nan)
+    frame["miss_move"] = np.where(beat_eps == 0, frame["move"], np.nan)
+
+    grouped = frame.groupby("ticker", sort=True)
+    stats = grouped.agg(
+        earnings_analyzed=("move", "size"),
+        avg_move=("move", "mean"),
+        avg_abs_move=("abs_move", "mean"),
+        std_move=("move", "std"),
+        median_abs_move=("abs_move", "median"),
+        max_abs_move=("abs_move", "max"),
+        positive_reactions=("positive", "sum"),
+        negative_reactions=("negative", "sum"),
+        expected_count=("has_expected", "sum"),
+        within_expected=("within_expected", "sum"),
+        beat_eps_avg_move=("beat_move", "mean"),
+        miss_eps_avg_move=("miss_move", "mean"),
+    )
+    stats["p90_abs_move"] = grouped["abs_move"].quantile(0.9)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        stats["within_expected_pct"] = np.where(
+            stats["expected_count"] > 0,
+            stats["within_expected"] / stats["expected_count"] * 100, np.nan)
+
+    stats = stats.drop(columns=["within_expected"])
+    float_cols = ["avg_move", "avg_abs_move", "std_move", "median_abs_move", "p90_abs_move",
+                  "max_abs_move", "within_expected_pct", "beat_eps_avg_move", "miss_eps_avg_move"]
+    stats[float_cols] = stats[float_cols].round(2)
+    return stats
+
+
+def get_ticker_stats(tickers=None):
+    """Load earnings_history and compute per-ticker statistics. See compute_ticker_stats."""
+    return compute_ticker_stats(load_earnings_history(tickers))
+
+
+if __name__ == "__main__":
+    stats = get_ticker_stats()
+    if stats.empty:
+        print("No earnings history saved yet.")
+    else:
+        print(stats.sort_values("avg_abs_move").to_string())
@@ -0,0 +1,55 @@
+import threading
+from collections import OrderedDict
+import metrics
+
+# Tickers kept in memory before the least recently used one is evicted
+MAX_ENTRIES = 256
+
+# ticker -> (cycle_dates, EarningsSeries), least recently used first
+_entries = OrderedDict()
+_lock = threading.Lock()
+
+# Hit/miss counters for the in-memory results cache
+summary_stats = {"hits": 0, "misses": 0, "evictions": 0}
+metrics.register_counters("summary_cache", summary_stats)
+
+
+def get_cached_results(ticker, cycle_dates):
+    """
+    Return the cached EarningsSeries for exactly these earnings cycles (newest
+    first, as "YYYY-MM-DD"), or None if nothing cached covers them.
+    A longer cached lookback answers any shorter one. A new report shifts
+    cycle_dates, so entries from before it stop matching on their own.
+    """
+    ticker = ticker.upper()
+    with _lock:
+        entry = _entries.get(ticker)
+        if entry is None or entry[0][:len(cycle_dates)] != list(cycle_dates):
+            summary_stats["misses"] += 1
+            return None
+        _entries.move_to_end(ticker)
+        summary_stats["hits"] += 1
+        cached_results = entry[1]
+
+    # Results are newest first like cycle_dates, so a shorter lookback is a leading slice
+    return cached_results.since(cycle_dates[-1]) if cycle_dates else cached_results[:0]
+
+
+def store_results(ticker, cycle_dates, results):
+    """Cache a ticker's EarningsSeries for the cycles it was calculated over."""
+    ticker = ticker.upper()
+    with _lock:
+        _entries[ticker] = (list(cycle_dates), results)
+        _entries.move_to_end(ticker)
+        while len(_entries) > MAX_ENTRIES:
+            _entries.popitem(last=False)
+            summary_stats["evictions"] += 1
+
+
+def invalidate_results(ticker=None):
+    """Drop one ticker's cached results, or everything if no ticker is given."""
+    with _lock:
+        if ticker is None:
+            _entries.clear()
+        else:
+            _entries.pop(ticker.upper(), None)
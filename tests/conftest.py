@@ -0,0 +1,20 @@
+import os
+import sys
+
+import pytest
+
+# The modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+
+
+@pytest.fixture
+def use_db(tmp_path, monkeypatch):
+    """Point the database module at a fresh file; use_db(name) switches to another one."""
+    def use(name="trading_data.db"):
+        monkeypatch.setattr(database, "DB_PATH", str(tmp_path / name))
+        database.init_db()
+
+    use()
+    return use
@@ -0,0 +1,17 @@
+import database
+
+
+def _beat_flags(ticker, date):
+    return database.get_connection().execute(
+        'SELECT beat_expected, beat_eps FROM earnings_history WHERE ticker = ? AND earnings_date = ?',
+        (ticker, date)).fetchone()
+
+
+def test_zero_values_give_the_same_beat_flags_on_insert_and_update(use_db):
+    # Updated: the row already exists from its expected move
+    database.save_expected_moves([("AMZN", "2024-04-30", 4.0)])
+    database.save_earnings("AMZN", "2024-04-30", 0.0, eps_estimate=0.0, eps_actual=0.0)
+    # Inserted
+    database.save_earnings("AMZN", "2024-05-01", 0.0, expected_move_pct=4.0, eps_estimate=0.0, eps_actual=0.0)
+
+    assert _beat_flags("AMZN", "2024-04-30") == _beat_flags("AMZN", "2024-05-01") == (1, 1)
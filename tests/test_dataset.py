@@ -0,0 +1,35 @@
+import database
+import dataset
+
+
+def _report(ticker, date):
+    return database.get_connection().execute('''
+        SELECT expected_move_pct, actual_move_pct, beat_expected, eps_estimate, eps_actual, beat_eps
+        FROM earnings_history WHERE ticker = ? AND earnings_date = ?
+    ''', (ticker, date)).fetchone()
+
+
+def test_partial_import_keeps_stored_values(use_db, tmp_path):
+    # A database holding only the expected move for a report...
+    use_db("partial.db")
+    database.save_expected_moves([("AAPL", "2024-05-02", 5.0)])
+    dataset.export_dataset(str(tmp_path / "export"))
+
+    # ...merged into one that already has the actual move and EPS
+    use_db("full.db")
+    database.save_earnings("AAPL", "2024-05-02", 3.2, eps_estimate=1.0, eps_actual=1.2)
+    dataset.import_dataset(str(tmp_path / "export"))
+
+    assert _report("AAPL", "2024-05-02") == (5.0, 3.2, 1, 1.0, 1.2, 1)
+
+
+def test_import_overrides_with_values_it_has(use_db, tmp_path):
+    use_db("source.db")
+    database.save_earnings("MSFT", "2024-04-25", -7.5, expected_move_pct=5.0, eps_estimate=2.0, eps_actual=1.9)
+    dataset.export_dataset(str(tmp_path / "export"))
+
+    use_db("target.db")
+    database.save_earnings("MSFT", "2024-04-25", 1.0, eps_estimate=2.0)
+    dataset.import_dataset(str(tmp_path / "export"))
+
+    assert _report("MSFT", "2024-04-25") == (5.0, -7.5, 0, 2.0, 1.9, 0)
@@ -0,0 +1,43 @@
+import pandas as pd
+
+from expected_move import collect_chains, straddle_implied_moves
+
+
+class CallsOnlyProvider:
+    """One expiration whose chain came back without any puts."""
+
+    def get_spot(self, ticker):
+        return 100.0
+
+    def get_expirations(self, ticker):
+        return ["2024-05-03"]
+
+    def get_chain(self, ticker, expiration):
+        calls = pd.DataFrame({"strike": [95.0, 100.0, 105.0], "bid": [6.0, 3.0, 1.0],
+                              "ask": [6.4, 3.2, 1.2], "lastPrice": [6.2, 3.1, 1.1]})
+        return calls, pd.DataFrame()
+
+
+def test_calls_only_chain_has_no_straddle():
+    chains, spots = collect_chains({"AAPL": pd.Timestamp("2024-05-02")}, CallsOnlyProvider())
+    snapshots = straddle_implied_moves(chains, spots)
+    assert snapshots.empty
+    assert list(snapshots.columns) == ["ticker", "expiration", "spot", "atm_strike",
+                                       "straddle", "implied_move_pct"]
+
+
+def test_chains_without_puts_have_no_straddle():
+    chains = pd.DataFrame({"ticker": ["AAPL"] * 2, "expiration": ["2024-05-03"] * 2, "type": ["call"] * 2,
+                           "strike": [100.0, 105.0], "bid": [3.0, 1.0], "ask": [3.2, 1.2],
+                           "lastPrice": [3.1, 1.1]})
+    assert straddle_implied_moves(chains, {"AAPL": 101.0}).empty
+
+
+def test_straddle_at_strike_nearest_spot():
+    chains = pd.DataFrame({
+        "ticker": ["AAPL"] * 4, "expiration": ["2024-05-03"] * 4,
+        "type": ["call", "call", "put", "put"], "strike": [100.0, 105.0, 100.0, 105.0],
+        "bid": [3.0, 1.0, 2.0, 5.0], "ask": [3.2, 1.2, 2.2, 5.2], "lastPrice": [3.1, 1.1, 2.1, 5.1],
+    })
+    snapshots = straddle_implied_moves(chains, {"AAPL": 101.0})
+    assert snapshots[["atm_strike", "straddle", "implied_move_pct"]].values.tolist() == [[100.0, 5.2, 5.15]]
@@ -0,0 +1,54 @@
+import threading
+
+import data_fetcher
+from benchmark import synthesize_fixtures
+from jobs import JobExecutor
+from providers import ReplayProvider
+
+
+class GatedProvider(ReplayProvider):
+    """Replays fixtures, counting price requests; the first one for `ticker` waits for `release`."""
+
+    def __init__(self, directory, ticker):
+        super().__init__(directory)
+        self.ticker = ticker
+        self.price_calls = []
+        self.fetching = threading.Event()
+        self.release = threading.Event()
+
+    def price_history(self, ticker, start, end):
+        self.price_calls.append(ticker)
+        if ticker == self.ticker and not self.fetching.is_set():
+            self.fetching.set()
+            self.release.wait(5)
+        return super().price_history(ticker, start, end)
+
+
+def test_superseded_analysis_stops_fetching(use_db, tmp_path, monkeypatch):
+    synthesize_fixtures(str(tmp_path / "fixtures"), tickers=2)
+    provider = GatedProvider(str(tmp_path / "fixtures"), "SYN000")
+    monkeypatch.setattr(data_fetcher, "provider", provider)
+
+    def analysis(ticker):
+        def fetch(report, cancelled):
+            return data_fetcher.analyze_ticker(ticker, on_result=report, cancelled=cancelled)
+        return fetch
+
+    executor = JobExecutor(max_workers=2)
+    delivered = []
+    first = executor.submit("analysis", "SYN000", analysis("SYN000"), delivered.append,
+                            on_progress=lambda result: None, cancellable=True)
+    assert provider.fetching.wait(5)
+
+    # Clicking the next ticker while the first one's newest-report request is in flight
+    second = executor.submit("analysis", "SYN001", analysis("SYN001"), delivered.append,
+                             on_progress=lambda result: None, cancellable=True)
+    provider.release.set()
+    first.future.result(5)
+    second.future.result(5)
+    executor.shutdown()
+
+    # The streamed analysis would have made a second request for SYN000's older reports
+    assert provider.price_calls.count("SYN000") == 1
+    assert provider.price_calls.count("SYN001") == 2
+    assert len(delivered) == 1 and delivered[0]["ticker"] == "SYN001"
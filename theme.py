@@ -0,0 +1,10 @@
+# --- Color Scheme ---
+BG_DARK = "#1e1e2e"
+BG_MID = "#2a2a3e"
+BG_LIGHT = "#313145"
+ACCENT = "#4f8ef7"
+GREEN = "#4caf82"
+RED = "#e05c5c"
+TEXT = "#e0e0e0"
+TEXT_DIM = "#888888"
+WHITE = "#ffffff"
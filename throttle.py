@@ -0,0 +1,262 @@
+"""
+Rate-limited access to the data provider.
+
+Every network fetch goes through a RequestScheduler, which
+  - spaces requests with a token bucket whose rate adapts: it creeps up after
+    each success and halves when the provider throttles (AIMD), settling near
+    the fastest rate the provider tolerates
+  - runs identical concurrent requests (same key) once and shares the result
+  - retries throttled requests with jittered exponential backoff
+  - opens a circuit breaker after repeated throttling, failing fast instead
+    of hammering the provider, and lets one trial request through once it cools down
+
+    python throttle.py    # simulate a scan against a fake throttling provider
+"""
+import random
+import sys
+import threading
+import time
+from concurrent.futures import Future
+
+import metrics
+
+
+class ProviderError(Exception):
+    """The provider couldn't be reached: still throttled after every retry, or the circuit is open."""
+
+
+class ThrottledError(ProviderError):
+    """The provider rejected a request for exceeding its rate limit."""
+
+
+class CircuitOpenError(ProviderError):
+    """Requests are paused after repeated throttling."""
+
+
+def _status_code(error):
+    """HTTP status carried by an exception or its response, if any."""
+    for source in (error, getattr(error, "response", None)):
+        status = getattr(source, "status_code", None) or getattr(source, "status", None)
+        if status is not None:
+            return status
+    return None
+
+
+def is_throttle_error(error):
+    """
+    Whether an exception from the provider means "slow down": a ThrottledError,
+    yfinance's YFRateLimitError, or an HTTP 429 response.
+    """
+    if isinstance(error, ThrottledError):
+        return True
+    # Only looked up if yfinance is already loaded; otherwise it can't have raised
+    yf_errors = sys.modules.get("yfinance.exceptions")
+    if yf_errors is not None and isinstance(error, getattr(yf_errors, "YFRateLimitError", ())):
+        return True
+    return _status_code(error) == 429
+
+
+class TokenBucket:
+    """Allows `rate` acquisitions per second on average, with bursts of up to `burst`."""
+
+    def __init__(self, rate, burst, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _take(self):
+        # Seconds to wait for a token, or 0 after taking one; caller holds the lock
+        now = self._clock()
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate
+
+    def try_acquire(self):
+        """Take one token if one is available right now."""
+        with self._lock:
+            return self._take() == 0
+
+    def acquire(self):
+        """Take one token, sleeping until one is available."""
+        while True:
+            with self._lock:
+                wait = self._take()
+            if not wait:
+                return
+            self._sleep(wait)
+
+
+class RequestScheduler:
+    """Token bucket, in-flight dedup, backoff and circuit breaker around provider calls."""
+
+    def __init__(self, rate=2.0, burst=5, min_rate=0.2, max_rate=10.0, rate_step=0.05,
+                 max_retries=4, base_delay=1.0, max_delay=30.0,
+                 failure_threshold=5, cooldown=60.0,
+                 clock=time.monotonic, sleep=time.sleep, is_throttle=is_throttle_error):
+        self.bucket = TokenBucket(rate, burst, clock, sleep)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.rate_step = rate_step
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._clock = clock
+        self._sleep = sleep
+        self._is_throttle = is_throttle
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+
+    @property
+    def rate(self):
+        return self.bucket.rate
+
+    def set_rate(self, rate, max_rate=None):
+        """Change the current (and optionally the maximum) request rate, e.g. to share a limit across processes."""
+        with self._lock:
+            if max_rate is not None:
+                self.max_rate = max_rate
+            self.bucket.rate = max(self.min_rate, min(rate, self.max_rate))
+
+    def call(self, key, fn, *args, **kwargs):
+        """
+        Run fn(*args, **kwargs) under the rate limit and return its result. A call
+        with the same key as one already in flight waits for that one instead.
+        Throttling is retried with backoff; other errors are raised unchanged.
+        Raises ProviderError when the provider stays unavailable.
+        """
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+        if not owner:
+            metrics.count("provider.deduplicated")
+            return future.result()
+
+        try:
+            result = self._call_with_retries(fn, args, kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+    def _call_with_retries(self, fn, args, kwargs):
+        for attempt in range(self.max_retries + 1):
+            trial = self._admit()
+            self.bucket.acquire()
+            metrics.count("provider.requests")
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                if not self._is_throttle(e):
+                    self._release_trial(trial)
+                    raise
+                self._on_throttle(trial)
+                if attempt == self.max_retries:
+                    raise ThrottledError(f"Still throttled after {attempt + 1} attempts: {e}") from e
+                self._sleep(self._backoff(attempt))
+                continue
+            self._on_success()
+            return result
+
+    def _admit(self):
+        """Check the circuit breaker. Returns True when this call is the half-open trial."""
+        with self._lock:
+            if self._opened_at is None:
+                return False
+            if self._clock() - self._opened_at < self.cooldown or self._trial_running:
+                metrics.count("provider.circuit_rejected")
+                raise CircuitOpenError("Provider requests paused after repeated throttling")
+            self._trial_running = True
+            return True
+
+    def _release_trial(self, trial):
+        if trial:
+            with self._lock:
+                self._trial_running = False
+
+    def _on_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+            self.bucket.rate = min(self.max_rate, self.bucket.rate + self.rate_step)
+
+    def _on_throttle(self, trial):
+        metrics.count("provider.throttled")
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            self.bucket.rate = max(self.min_rate, self.bucket.rate / 2)
+            if trial or self._failures >= self.failure_threshold:
+                if self._opened_at is None or trial:
+                    metrics.count("provider.circuit_opened")
+                self._opened_at = self._clock()
+
+    def _backoff(self, attempt):
+        # "Equal jitter": half the exponential delay fixed, half random
+        delay = min(self.max_delay, self.base_delay * 2 ** attempt)
+        return delay / 2 + random.uniform(0, delay / 2)
+
+
+# Shared by every Yahoo Finance fetch in this process
+yahoo = RequestScheduler()
+
+
+class FakeProvider:
+    """
+    Local stand-in for a rate-limited provider: serves `limit` requests per
+    second (bursts up to `burst`) and raises ThrottledError beyond that.
+    """
+
+    def __init__(self, limit=5.0, burst=5, latency=0.01, clock=time.monotonic, sleep=time.sleep):
+        self._bucket = TokenBucket(limit, burst, clock, sleep)
+        self.latency = latency
+        self._sleep = sleep
+        self.calls = 0
+        self.throttled = 0
+        self._lock = threading.Lock()
+
+    def fetch(self, ticker):
+        allowed = self._bucket.try_acquire()
+        with self._lock:
+            self.calls += 1
+            if not allowed:
+                self.throttled += 1
+        if not allowed:
+            raise ThrottledError("Too Many Requests")
+        self._sleep(self.latency)
+        return f"data for {ticker}"
+
+
+if __name__ == "__main__":
+    from concurrent.futures import ThreadPoolExecutor
+
+    provider = FakeProvider(limit=5.0)
+    scheduler = RequestScheduler(rate=2.0, max_rate=20.0, rate_step=0.25, base_delay=0.2)
+    tickers = [f"T{i}" for i in range(100)]
+
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda t: scheduler.call(("fake", t), provider.fetch, t), tickers))
+    elapsed = time.monotonic() - start
+    print(f"{len(results)} tickers in {elapsed:.1f}s ({len(results) / elapsed:.1f}/s against a 5/s limit)")
+    print(f"Provider calls: {provider.calls}, throttled: {provider.throttled}, "
+          f"final rate: {scheduler.rate:.2f}/s")
@@ -0,0 +1,215 @@
+"""
+List and table widgets that only hold the rows currently on screen.
+
+The rows live in a backing sequence (a list, an EarningsSeries, or a QueryRows
+reading pages from the database). The widget holds one line per visible row,
+and scrolling or refresh() rewrites only the lines whose text changed, so the
+cost of a redraw depends on the window height, not the number of rows.
+"""
+import tkinter as tk
+from tkinter import ttk
+from tkinter import font as tkfont
+
+# Rows moved per mouse-wheel notch
+WHEEL_ROWS = 3
+
+
+class QueryRows:
+    """
+    Sequence view of a query: len() calls count() and slicing calls
+    fetch(offset, limit), so only the requested rows are ever read.
+    """
+
+    def __init__(self, count, fetch):
+        self._count = count
+        self._fetch = fetch
+
+    def __len__(self):
+        return self._count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice) or index.step not in (None, 1):
+            raise TypeError("QueryRows only supports contiguous slices")
+        start = max(index.start or 0, 0)
+        stop = index.stop if index.stop is not None else start + len(self)
+        return self._fetch(start, max(stop - start, 0))
+
+
+class _VirtualRows:
+    """
+    Windowing, scrolling and diffed rendering shared by VirtualList and VirtualTable.
+    Subclasses provide _measure_row() (pixel height of one row), _content_height()
+    (pixels available for rows, or <= 1 before the widget is laid out) and
+    _render(lines) (show these lines, rewriting only the ones that changed).
+    """
+
+    def _init_rows(self, scrollbar, format):
+        self.rows = []
+        self.offset = 0
+        self.total = 0
+        self.shown = []
+        self.format = format
+        self.scrollbar = scrollbar
+        if scrollbar is not None:
+            scrollbar.configure(command=self._on_scrollbar)
+        self.bind("<MouseWheel>", self._on_wheel)
+        self.bind("<Button-4>", self._on_wheel)
+        self.bind("<Button-5>", self._on_wheel)
+        self.row_height = self._measure_row()
+        self.bind("<Configure>", self._on_configure)
+
+    def set_rows(self, rows):
+        """Show a new backing sequence from its first row."""
+        self.rows = rows
+        self.offset = 0
+        self.refresh()
+
+    def refresh(self):
+        """Re-read the visible window of the backing sequence, e.g. after rows were added or removed."""
+        self.total = len(self.rows)
+        visible = self._visible_rows()
+        self.offset = max(0, min(self.offset, self.total - visible))
+        # A partly visible bottom line is filled too, but scrolling only counts whole rows
+        window = self.rows[self.offset:self.offset + visible + self._partial_row()]
+        self._render([self.format(row) for row in window])
+        if self.scrollbar is not None:
+            if self.total:
+                self.scrollbar.set(self.offset / self.total, min(1.0, (self.offset + visible) / self.total))
+            else:
+                self.scrollbar.set(0.0, 1.0)
+
+    def scroll_to(self, offset):
+        """Make row `offset` the first one on screen (clamped to the rows there are)."""
+        offset = max(0, min(int(offset), self.total - self._visible_rows()))
+        if offset != self.offset:
+            self.offset = offset
+            self.refresh()
+
+    def see(self, index):
+        """Scroll just enough for row `index` to be on screen."""
+        visible = self._visible_rows()
+        if index < self.offset:
+            self.scroll_to(index)
+        elif index >= self.offset + visible:
+            self.scroll_to(index - visible + 1)
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(round(float(amount) * self.total))
+        elif unit == "pages":
+            self.scroll_to(self.offset + int(amount) * max(self._visible_rows() - 1, 1))
+        else:
+            self.scroll_to(self.offset + int(amount))
+
+    def _on_wheel(self, event):
+        if event.num == 4 or event.delta > 0:
+            self.scroll_to(self.offset - WHEEL_ROWS)
+        else:
+            self.scroll_to(self.offset + WHEEL_ROWS)
+        return "break"  # the widget's own scrolling would move within the window only
+
+    def _on_configure(self, event):
+        # Row height only changes with the font or style, so it is measured here rather than per refresh
+        self.row_height = self._measure_row()
+        self.refresh()
+
+    def _visible_rows(self):
+        """Rows that fit entirely in the widget."""
+        height = self._content_height()
+        if height <= 1:  # not laid out yet
+            return int(self.cget("height"))
+        return max(1, height // self.row_height)
+
+    def _partial_row(self):
+        """1 when a row is cut off at the bottom of the widget, else 0."""
+        height = self._content_height()
+        return 1 if height > 1 and height % self.row_height else 0
+
+
+class VirtualList(_VirtualRows, tk.Listbox):
+    """
+    Listbox over a backing sequence. format(row) gives each row's text.
+    The selection follows the row, not the line, as the list scrolls.
+    """
+
+    def __init__(self, parent, scrollbar=None, format=str, **options):
+        tk.Listbox.__init__(self, parent, **options)
+        self._init_rows(scrollbar, format)
+        self.selected_index = None
+        self.bind("<<ListboxSelect>>", self._on_select)
+
+    def selected(self):
+        """The selected row from the backing sequence, or None."""
+        if self.selected_index is None or self.selected_index >= self.total:
+            return None
+        return self.rows[self.selected_index:self.selected_index + 1][0]
+
+    def set_rows(self, rows):
+        self.selected_index = None
+        super().set_rows(rows)
+
+    def _on_select(self, event):
+        selection = self.curselection()
+        if selection:
+            self.selected_index = self.offset + selection[0]
+
+    def _measure_row(self):
+        return tkfont.Font(font=self.cget("font")).metrics("linespace") + 1
+
+    def _content_height(self):
+        height = self.winfo_height()
+        if height <= 1:
+            return height
+        return height - 2 * (int(self.cget("borderwidth")) + int(self.cget("highlightthickness")))
+
+    def _render(self, lines):
+        for i, line in enumerate(lines):
+            if i < len(self.shown):
+                if self.shown[i] == line:
+                    continue
+                self.delete(i)
+            self.insert(i, line)
+        if len(self.shown) > len(lines):
+            self.delete(len(lines), tk.END)
+        self.shown = lines
+
+        self.selection_clear(0, tk.END)
+        if self.selected_index is not None and 0 <= self.selected_index - self.offset < len(lines):
+            self.selection_set(self.selected_index - self.offset)
+
+
+class VirtualTable(_VirtualRows, ttk.Treeview):
+    """Treeview over a backing sequence. format(row) gives each row's tuple of column values."""
+
+    def __init__(self, parent, scrollbar=None, format=tuple, **options):
+        ttk.Treeview.__init__(self, parent, **options)
+        self._init_rows(scrollbar, format)
+        self.items = []
+
+    def _measure_row(self):
+        return int(ttk.Style(self).lookup("Treeview", "rowheight") or 20)
+
+    def _content_height(self):
+        height = self.winfo_height()
+        return height if height <= 1 else height - self._heading_height()
+
+    def _heading_height(self):
+        """Pixels above the first row: where it is drawn once it exists, else about one row."""
+        if self.items:
+            box = self.bbox(self.items[0])
+            if box:
+                return box[1]
+        return self.row_height
+
+    def _render(self, lines):
+        # Existing items are updated in place; items are only created or deleted when the window resizes
+        for i, values in enumerate(lines):
+            if i < len(self.items):
+                if self.shown[i] != values:
+                    self.item(self.items[i], values=values)
+            else:
+                self.items.append(self.insert("", "end", values=values))
+        if len(self.items) > len(lines):
+            self.delete(*self.items[len(lines):])
+            del self.items[len(lines):]
+        self.shown = lines